@@ -0,0 +1,55 @@
+"""
+Compares the JSON backends available to the json2 renderer on payloads
+similar to what the list endpoints return.
+
+    python benchmarks/json_backends.py [iterations]
+"""
+import datetime
+import decimal
+import sys
+import timeit
+
+from pyramid_restful.renderer import BACKENDS, JSON2
+
+
+def make_record(i):
+    return {
+        'id': i,
+        'name': u'Record {0}'.format(i),
+        'email': 'user{0}@example.com'.format(i),
+        'active': i % 2 == 0,
+        'balance': decimal.Decimal('{0}.25'.format(i)),
+        'created_at': datetime.datetime(2016, 1, 1, 12, 0, 0) + datetime.timedelta(minutes=i),
+        'birthday': datetime.date(1980, 1, 1) + datetime.timedelta(days=i),
+        'tags': ['a', 'b', 'c'],
+        'address': {'street': '{0} Main St.'.format(i), 'city': 'Springfield', 'zip': '12345'}
+    }
+
+
+PAYLOADS = {
+    'small_record': make_record(1),
+    'list_100': [make_record(i) for i in xrange(100)],
+    'list_1000': [make_record(i) for i in xrange(1000)],
+}
+
+
+def main(iterations=20):
+    backends = ['jsonify'] + sorted(BACKENDS)
+
+    print '{0:<12} {1:<14} {2:>12}'.format('backend', 'payload', 'msec/call')
+    for backend in backends:
+        try:
+            renderer = JSON2(backend=backend)
+        except ImportError:
+            print '{0:<12} {1:<14} {2:>12}'.format(backend, '-', 'unavailable')
+            continue
+
+        render = renderer(None)
+        for name, payload in sorted(PAYLOADS.items()):
+            timer = timeit.Timer(lambda: render(payload, {'request': None}))
+            best = min(timer.repeat(3, iterations)) / iterations
+            print '{0:<12} {1:<14} {2:>12.3f}'.format(backend, name, best * 1000)
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,225 @@
+"""
+Measures the throughput and per-call latency of the request paths of an API:
+dispatch with a growing number of routes, each kind of service, the
+documentation and route listings, payload extraction and the error handlers.
+
+    python benchmarks/suite.py [--iterations N] [--filter NAME] [--output FILE] [--compare FILE]
+
+Results are written as JSON so that the runs of two releases can be compared
+with `--compare`, which reports the change in median latency per scenario.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import timeit
+import types
+
+from pyramid.config import Configurator
+from pyramid.request import Request
+
+import pyramid_restful
+from pyramid_restful import endpoint
+from pyramid_restful.utils import get_payload
+
+JSON_HEADERS = {'Accept': 'application/json'}
+
+
+class Scenario(object):
+    """
+    A single benchmark.  `prepare` builds the argument for each call outside
+    of the timed region and `call` runs the code being measured.
+    """
+    def __init__(self, name, call, prepare=None):
+        self.name = name
+        self.call = call
+        self.prepare = prepare or (lambda: None)
+
+    def run(self, iterations, warmup=10):
+        for _ in xrange(warmup):
+            self.call(self.prepare())
+
+        timings = []
+        timer = timeit.default_timer
+        for _ in xrange(iterations):
+            arg = self.prepare()
+            start = timer()
+            self.call(arg)
+            timings.append(timer() - start)
+
+        timings.sort()
+        total = sum(timings)
+        return {
+            'name': self.name,
+            'iterations': iterations,
+            'requests_per_second': iterations / total if total else None,
+            'mean_ms': total / iterations * 1000,
+            'min_ms': timings[0] * 1000,
+            'median_ms': timings[iterations // 2] * 1000,
+            'p95_ms': timings[min(int(iterations * 0.95), iterations - 1)] * 1000
+        }
+
+
+def make_app(register, **settings):
+    options = {'restful.api.root': '/api/v1'}
+    options.update(settings)
+
+    config = Configurator(settings=options)
+    config.include('pyramid_restful')
+    register(config.registry.rest_api)
+    return config.make_wsgi_app()
+
+
+def request_call(app, path, headers=JSON_HEADERS, status=200):
+    def call(_):
+        response = Request.blank(path, headers=headers).get_response(app)
+        assert response.status_int == status, (path, response.status)
+    return call
+
+
+def routes_scenarios():
+    for count in (10, 100, 1000):
+        def register(api, count=count):
+            endpoints = []
+            for i in xrange(count):
+                def item(request):
+                    return request.matchdict['id']
+                item.__name__ = 'item{0}'.format(i)
+                endpoints.append(endpoint.get(pattern='/items{0}/{{id}}'.format(i))(item))
+            api.register(endpoints)
+
+        app = make_app(register)
+        yield Scenario('dispatch_routes_{0}'.format(count),
+                       request_call(app, '/api/v1/items{0}/1'.format(count - 1)))
+
+
+def service_scenarios():
+    def register(api):
+        module = types.ModuleType('accounts')
+
+        @endpoint.get()
+        def lookup(request):
+            return {'id': 1}
+
+        module.lookup = lookup
+
+        class users(object):
+            def __init__(self, request):
+                self.request = request
+
+            @endpoint.get()
+            def lookup(self):
+                return {'id': 1}
+
+        @endpoint.get(pattern='/projects/{id}')
+        def project(request):
+            return {'id': request.matchdict['id']}
+
+        api.register(module)
+        api.register(users)
+        api.register(project)
+
+    app = make_app(register)
+    yield Scenario('service_module', request_call(app, '/api/v1/accounts/lookup'))
+    yield Scenario('service_class', request_call(app, '/api/v1/users/lookup'))
+    yield Scenario('service_pattern', request_call(app, '/api/v1/projects/1'))
+    yield Scenario('returning_routes', request_call(app, '/api/v1?returning=routes'))
+
+    html = {'Accept': 'text/html'}
+    yield Scenario('documentation_render', request_call(app, '/api/v1', headers=html))
+
+    uncached = make_app(register, **{'restful.documentation.cache': 'false'})
+    yield Scenario('documentation_render_uncached', request_call(uncached, '/api/v1', headers=html))
+
+
+def payload_scenarios():
+    for count in (100, 10000):
+        body = json.dumps({'field{0}'.format(i): {'value': i, 'tags': ['a', 'b']} for i in xrange(count)})
+
+        def prepare(body=body):
+            request = Request.blank('/api/v1/items?page=1&limit=100', method='POST', body=body)
+            request.content_type = 'application/json'
+            return request
+
+        yield Scenario('get_payload_{0}_keys'.format(count), get_payload, prepare=prepare)
+
+
+def error_scenarios():
+    def register(api):
+        @endpoint.get()
+        def broken(request):
+            raise StandardError('broken')
+
+        api.register(broken)
+
+    app = make_app(register)
+    yield Scenario('standard_error', request_call(app, '/api/v1/broken', status=500))
+    yield Scenario('http_error_404', request_call(app, '/api/v1/broken/missing', status=404))
+
+
+SCENARIOS = (routes_scenarios, service_scenarios, payload_scenarios, error_scenarios)
+
+
+def compare(results, baseline):
+    previous = {result['name']: result for result in baseline['results']}
+
+    print >> sys.stderr, '\n{0:<32} {1:>12} {2:>12} {3:>8}'.format('scenario', 'baseline ms', 'current ms', 'change')
+    for result in results['results']:
+        before = previous.get(result['name'])
+        if before is None:
+            continue
+
+        change = (result['median_ms'] - before['median_ms']) / before['median_ms'] * 100
+        print >> sys.stderr, '{0:<32} {1:>12.3f} {2:>12.3f} {3:>+7.1f}%'.format(
+            result['name'], before['median_ms'], result['median_ms'], change
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks the pyramid_restful request paths.')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--filter', default='', help='only run scenarios containing this text')
+    parser.add_argument('--output', help='file to write the JSON results to, defaults to stdout')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+    args = parser.parse_args(argv)
+
+    # errors are logged the way a deployment would, without filling the console
+    handler = logging.StreamHandler(open(os.devnull, 'w'))
+    handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    logging.getLogger().addHandler(handler)
+
+    results = {
+        'version': pyramid_restful.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': []
+    }
+
+    print >> sys.stderr, '{0:<32} {1:>10} {2:>10} {3:>10}'.format('scenario', 'req/sec', 'median ms', 'p95 ms')
+    for scenarios in SCENARIOS:
+        for scenario in scenarios():
+            if args.filter not in scenario.name:
+                continue
+
+            result = scenario.run(args.iterations)
+            results['results'].append(result)
+            print >> sys.stderr, '{name:<32} {requests_per_second:>10.0f} {median_ms:>10.3f} {p95_ms:>10.3f}'.format(
+                **result
+            )
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -16,20 +16,57 @@ __version_info__ = (__major__, __minor__, __revision__)
 __version__ = '{0}.{1}.{2}'.format(*__version_info__)
 
 
+from pyramid.settings import asbool
+
 from .endpoint import *
 
 
 def includeme(config):
+    settings = config.registry.settings
+
     # define a new renderer for json
-    config.add_renderer('json2', factory='pyramid_restful.renderer.json2_renderer_factory')
+    json_options = {
+        k.replace('restful.json.', ''): v
+        for k, v in settings.items()
+        if k.startswith('restful.json.')
+    }
 
-    settings = config.registry.settings
+    if json_options:
+        from .renderer import JSON2
+        renderer = JSON2(backend=json_options.get('backend'),
+                         chunk_size=int(json_options.get('chunk_size', 100)),
+                         etag=asbool(json_options.get('etag', False)),
+                         compression=asbool(json_options.get('compression', False)),
+                         compression_min_size=int(json_options.get('compression.min_size', 1024)),
+                         compression_level=int(json_options.get('compression.level', 6)))
+        config.add_renderer('json2', factory=renderer)
+    else:
+        config.add_renderer('json2', factory='pyramid_restful.renderer.json2_renderer_factory')
+
+    # provide the merged payload view for requests
+    config.add_request_method('pyramid_restful.utils.Payload', 'payload', reify=True)
+
+    # provide the sparse fieldset requested by the client
+    from .fields import FieldSet
+    config.add_request_method(FieldSet.factory(settings.get('restful.fields.param', 'fields')), 'fields', reify=True)
+
+    # provide the incremental JSON body reader for requests
+    from .reader import JSONBodyReader
+    reader = JSONBodyReader.factory(max_size=int(settings.get('restful.body.max_size', 10485760)),
+                                    max_depth=int(settings.get('restful.body.max_depth', 64)),
+                                    chunk_size=int(settings.get('restful.body.chunk_size', 65536)))
+    config.add_request_method(reader, 'json_reader', reify=True)
 
     # create the API factory
     api_root = settings.get('restful.api.root')
 
     if api_root:
-        from .api import ApiFactory
+        from .api import ApiFactory, log
+        from .errors import ErrorLog, QueueHandler
+
+        # hand error logs off to a background thread
+        if asbool(settings.get('restful.errors.log_queue', False)):
+            QueueHandler.install(log)
 
         # setup cross-origin support
         cors_options = {
@@ -38,14 +75,39 @@ def includeme(config):
             if k.startswith('restful.cors.')
         }
 
+        # cursors signed with the random per-process default key are
+        # rejected by other workers and after a restart
+        pagination_secret = settings.get('restful.pagination.secret')
+        if not pagination_secret:
+            log.warning('restful.pagination.secret is not set, pagination cursors will only be '
+                        'accepted by the process that issued them')
+
         api = ApiFactory(
             application=settings.get('restful.application', 'pyramid_orb'),
             version=settings.get('restful.api.version', '1.0.0'),
-            cors_options=cors_options or None
+            documentation_cache=asbool(settings.get('restful.documentation.cache', True)),
+            cors_options=cors_options or None,
+            batch_path=settings.get('restful.batch.path'),
+            batch_workers=int(settings.get('restful.batch.workers', 0)),
+            batch_max_items=int(settings.get('restful.batch.max_items', 50)),
+            metrics=asbool(settings.get('restful.metrics', False)),
+            metrics_permission=settings.get('restful.metrics.permission'),
+            metrics_path=settings.get('restful.metrics.path'),
+            metrics_directory=settings.get('restful.metrics.directory'),
+            error_log=ErrorLog.from_settings(log, settings),
+            pagination_secret=pagination_secret
         )
 
         permission = settings.get('restful.api.permission')
         api.serve(config, api_root, route_name='restful.api', permission=permission)
 
+        # load the services compiled into a manifest, which are imported on
+        # first use instead of at startup, unless the manifest is being built
+        manifest = settings.get('restful.manifest')
+        if manifest:
+            from .manifest import building, read_manifest
+            if not building():
+                api.load_manifest(read_manifest(manifest))
+
         # store the API instance on the configuration
         config.registry.rest_api = api
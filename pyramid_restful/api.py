@@ -1,19 +1,30 @@
 from functools import partial
+import binascii
+import hashlib
 import inspect
 import logging
-import projex.text
+import os
 import textwrap
+import threading
 
-from collections import defaultdict
+from collections import defaultdict, Iterator, OrderedDict
 from pyramid.urldispatch import Route
-from pyramid.httpexceptions import HTTPNotFound, HTTPForbidden, HTTPException, HTTPBadRequest
+from pyramid.httpexceptions import HTTPNotFound, HTTPForbidden, HTTPException, HTTPBadRequest, HTTPServiceUnavailable
 from pyramid.response import Response
 
+from .batch import BatchProcessor
 from .documentation import Documentation, SectionGroup, Section
+from .errors import ErrorLog, error_names, nativestring
+from .manifest import MANIFEST_VERSION, LazyEndpoint, LazyService, describe, import_path, is_importable, resolve
+from .metrics import Metrics, FileBackend, NULL_TIMINGS, exposition
+from .renderer import jsonify
+from .routes import RouteTrie
 from .services import *
 
 log = logging.getLogger(__name__)
 
+_MISSING = object()
+
 
 class ApiFactory(dict):
     def __init__(self,
@@ -22,19 +33,88 @@ class ApiFactory(dict):
                  documentation_package='pyramid_restful',
                  documentation_folder='templates',
                  documentation_template='documentation.html.jinja',
-                 cors_options=None):
+                 documentation_cache=True,
+                 cors_options=None,
+                 batch_path=None,
+                 batch_workers=0,
+                 batch_max_items=50,
+                 metrics=False,
+                 metrics_permission=None,
+                 metrics_path=None,
+                 metrics_directory=None,
+                 error_log=None,
+                 pagination_secret=None):
         super(ApiFactory, self).__init__()
 
         # private properties
-        self.__documentation = Documentation(documentation_package, documentation_folder, documentation_template)
+        self.__lock = threading.Lock()
+        self.__route_listing = None
+        self.__registrations = OrderedDict()
+        self.__route_registrations = OrderedDict()
+        self.__lazy_routes = {}
+        self.__documentation = Documentation(documentation_package,
+                                             documentation_folder,
+                                             documentation_template,
+                                             cache=documentation_cache)
 
         # public properties
         self.version = version
         self.application = application
         self.routes = []
+        self.route_trie = RouteTrie()
         self.services = {}
+        self.sections = {}
+        self.indexes = {}
         self.base_permission = None
         self.cors_options = cors_options
+        self.batch_path = batch_path
+        self.batch_workers = batch_workers
+        self.batch_max_items = batch_max_items
+        self.batch = None
+        self.manifest_loaded = False
+        self.error_log = error_log or ErrorLog(log)
+        self.pagination_secret = pagination_secret or binascii.hexlify(os.urandom(16))
+        self.metrics_permission = metrics_permission
+        self.metrics_path = metrics_path
+        if metrics or metrics_path:
+            self.metrics = Metrics(backend=FileBackend(metrics_directory) if metrics_directory else None)
+        else:
+            self.metrics = None
+        self.cors_response_headers = {}
+        self.cors_preflight_headers = {}
+
+        # compute the CORS headers up front so they do not need to be
+        # generated per request
+        if cors_options:
+            self.cors_preflight_headers = {
+                '-'.join([p.capitalize() for p in k.split('_')]): str(v)
+                for k, v in cors_options.items()
+            }
+
+            origin = cors_options.get('access_control_allow_origin', '*')
+            expose_headers = cors_options.get('access_control_expose_headers', '')
+            self.cors_response_headers['Access-Control-Allow-Origin'] = str(origin)
+            if expose_headers:
+                self.cors_response_headers['Access-Control-Expose-Headers'] = str(expose_headers)
+
+    def add_route(self, endpoint):
+        """
+        Registers a patterned endpoint with this API.
+
+        :param endpoint: <pyramid_restful.endpoint.Endpoint>
+        """
+        route = Route('', endpoint.pattern)
+        self.routes.append((route, endpoint))
+        self.route_trie.add(endpoint.pattern, endpoint)
+        self.clear_cache()
+
+    def clear_cache(self):
+        """
+        Clears the cached documentation and route listing for this API, this
+        is called automatically whenever the exposed services change.
+        """
+        self.__route_listing = None
+        self.__documentation.clear_cache()
 
     def collect_documentation(self, name, service_info):
         service, service_object = service_info
@@ -70,21 +150,29 @@ class ApiFactory(dict):
 
         :param request: <pyramid.request.Request>
         """
-        def cors_headers(request, response):
-            if request.method.lower() == 'options':
-                response.headers.update({
-                    '-'.join([p.capitalize() for p in k.split('_')]): v
-                    for k, v in self.cors_options.items()
-                })
-            else:
-                origin = self.cors_options.get('access_control_allow_origin', '*')
-                expose_headers = self.cors_options.get('access_control_expose_headers', '')
-                response.headers['Access-Control-Allow-Origin'] = origin
-                if expose_headers:
-                    response.headers['Access-Control-Expose-Headers'] = expose_headers
+        request.add_response_callback(self.cors_headers)
+
+    def cors_headers(self, request, response):
+        """
+        Response callback that adds the precomputed CORS headers.
+
+        :param request: <pyramid.request.Request>
+        :param response: <pyramid.response.Response>
+        """
+        if request.method == 'OPTIONS':
+            response.headers.update(self.cors_preflight_headers)
+        else:
+            response.headers.update(self.cors_response_headers)
+
+    def cors_preflight(self, request):
+        """
+        Answers a CORS preflight request directly from the precomputed headers.
 
-        # setup the CORS supported response
-        request.add_response_callback(cors_headers)
+        :param request: <pyramid.request.Request>
+
+        :return: <pyramid.response.Response>
+        """
+        return Response(body='', headerlist=self.cors_preflight_headers.items())
 
     def factory(self, request, parent=None, name=None):
         """
@@ -94,6 +182,14 @@ class ApiFactory(dict):
 
         :return     <pyramid_restful.services.AbstractService>
         """
+        if self.metrics is not None:
+            self.metrics.start(request)
+
+        # preflight requests are answered without traversing the services
+        if self.cors_options and request.method == 'OPTIONS':
+            request.matchdict = {'traverse': ()}
+            return {}
+
         traverse = request.matchdict['traverse']
 
         # show documentation at the root path
@@ -104,49 +200,181 @@ class ApiFactory(dict):
             name = name or traverse[0]
 
             # look for direct pattern matches
-            traversed = '/' + '/'.join(traverse)
             service_type = None
             service_object = None
 
-            for route, endpoint in self.routes:
-                result = route.match(traversed)
-                if result is not None:
-                    request.matchdict = result
-                    request.endpoint = endpoint
-                    break
+            match = self.route_trie.match(traverse)
+            if match is not None:
+                endpoint, request.matchdict = match
+                if isinstance(endpoint, LazyEndpoint):
+                    endpoint = endpoint.resolve()
+                request.endpoint = endpoint
             else:
                 try:
                     service_type, service_object = self.services[name]
                 except KeyError:
                     raise HTTPNotFound()
 
+                if service_type is LazyService:
+                    service_type, service_object = self.resolve_service(name)
+
             if service_type:
                 if isinstance(service_type, Endpoint):
                     service[name] = service_type
                 elif service_object is None:
                     service[name] = service_type(request)
                 else:
-                    service[name] = service_type(request, service_object)
+                    service[name] = service_type(request, service_object, self.indexes.get(name))
 
             request.api_service = service
             return service
 
     def get_custom_return(self, request, returning):
         if returning == 'routes':
-            routes = {}
+            etag, body = self.route_listing()
 
-            # show the route paterns
-            for route, service in self.routes:
-                routes[route.pattern] = ','.join(sorted(service.callables.keys()))
+            # let clients re-use their copy when nothing has changed
+            if etag in request.if_none_match:
+                return Response(status=304, etag=etag)
+            else:
+                return Response(body=body, content_type='application/json', charset='UTF-8', etag=etag)
 
-            # show the service patterns
-            for service, obj in self.services.values():
-                routes.update(service.routes(obj))
+        # show the collected endpoint metrics
+        elif returning == 'metrics' and self.metrics is not None:
+            if self.metrics_permission and not request.has_permission(self.metrics_permission):
+                raise HTTPForbidden()
+            return self.metrics.collect()
 
-            return routes
         else:
             raise HTTPBadRequest()
 
+    def route_listing(self):
+        """
+        Returns the serialized route map for this API along with its strong
+        ETag.  The listing is only rebuilt when the registered services change.
+
+        :return: (<str> etag, <str> body)
+        """
+        listing = self.__route_listing
+        if listing is None:
+            body = jsonify(self.route_map())
+            listing = (hashlib.sha1(body).hexdigest(), body)
+            self.__route_listing = listing
+        return listing
+
+    def route_map(self):
+        """
+        Generates a mapping of the URL patterns to the HTTP methods they support.
+
+        :return: {<str> pattern: <str> methods, ..}
+        """
+        routes = {}
+
+        # show the route paterns
+        for route, service in self.routes:
+            routes[route.pattern] = ','.join(sorted(service.callables.keys()))
+
+        # show the routes loaded from a manifest
+        for pattern, methods in self.__lazy_routes.items():
+            routes.setdefault(pattern, methods)
+
+        # show the service patterns
+        for name, (service, obj) in self.services.items():
+            if service is LazyService:
+                routes.update(obj['routes'])
+            elif isinstance(service, Endpoint):
+                routes['/' + name] = ','.join(sorted(service.callables.keys()))
+            elif hasattr(service, 'routes'):
+                routes.update(service.routes(obj, name, self.indexes.get(name)))
+
+        return routes
+
+    def _call_endpoint(self, request, endpoint, callable, *args):
+        """
+        Calls the endpoint callable, short-circuiting with a 304 response when
+        the endpoint's ETag hook matches the client's copy, and paginating the
+        results of endpoints that have opted into it.
+        """
+        method = request.method.lower()
+
+        version = endpoint.etags.get(method)
+        if version is not None:
+            etag = version(request)
+            if etag is not None:
+                if etag in request.if_none_match:
+                    return Response(status=304, etag=etag)
+                request.response.etag = etag
+
+        paginator = endpoint.paginators.get(method)
+        if paginator is None:
+            return self._call_cached(request, endpoint, callable, *args)
+
+        page = request.page = paginator.page(request, self.pagination_secret)
+        result = self._call_cached(request, endpoint, callable, *args)
+        if isinstance(result, Response):
+            return result
+        else:
+            return paginator.paginate(request, page, result, self.pagination_secret)
+
+    def _call_cached(self, request, endpoint, callable, *args):
+        """
+        Calls the endpoint callable, returning a cached result when the
+        endpoint has a valid entry for this request.
+        """
+        cache = endpoint.caches.get(request.method.lower())
+        if cache is None:
+            return self._call_limited(request, endpoint, callable, *args)
+
+        key = cache.key(request)
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = self._call_limited(request, endpoint, callable, *args)
+
+            # streamed results and responses can only be used once
+            if not isinstance(result, (Iterator, Response)):
+                cache.set(key, result)
+        return result
+
+    def _call_limited(self, request, endpoint, callable, *args):
+        """
+        Calls the endpoint callable within its concurrency limit, rejecting
+        the request with a 503 response when no slot frees up in time.  The
+        slot of a streamed result is released once it has been read.
+        """
+        limit = endpoint.limits.get(request.method.lower())
+        if limit is None:
+            return callable(*args)
+
+        if self.metrics is not None:
+            request.restful_timings.endpoint.limit = limit
+
+        if not limit.acquire():
+            raise HTTPServiceUnavailable('This resource is busy, please try again later.',
+                                         headers={'Retry-After': str(limit.retry_after)})
+        streamed = False
+        try:
+            result = callable(*args)
+
+            # streamed results keep their slot until their rows have been read
+            if isinstance(result, Iterator):
+                result = limit.wrap(result)
+                streamed = True
+            return result
+        finally:
+            if not streamed:
+                limit.release()
+
+    def metrics_exposition(self, request):
+        """
+        Returns the collected metrics in the Prometheus text format.
+
+        :param request: <pyramid.request.Request>
+
+        :return: <pyramid.response.Response>
+        """
+        return Response(body=exposition(self.metrics.collect()),
+                        headerlist=[('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')])
+
     def process(self, request):
         is_root = bool(not request.traversed)
         is_json = 'application/json' in request.accept
@@ -185,6 +413,18 @@ class ApiFactory(dict):
             method = request.method.lower()
             action = request.params.get('action')
 
+            # record the time spent in each phase of the request
+            timings = getattr(request, 'restful_timings', NULL_TIMINGS)
+            if timings is not NULL_TIMINGS:
+                self.metrics.enter(request)
+
+            # endpoint methods on shared class instances are given the
+            # request as an argument
+            args = ()
+            if isinstance(caller, partial):
+                args = caller.args
+                caller = caller.func
+
             # process an endpoint function
             if isinstance(caller, Endpoint):
                 method = request.method.lower()
@@ -197,20 +437,25 @@ class ApiFactory(dict):
                     if permit and not request.has_permission(permit):
                         raise HTTPForbidden()
                     else:
+                        timings.mark('permission')
                         if action and hasattr(callable, action):
                             callable = getattr(callable, action)
-                        return callable(request)
+                        result = self._call_endpoint(request, caller, callable, request)
+                        timings.mark('call')
+                        return result
 
             # process an endpoint method
             elif inspect.ismethod(caller) and isinstance(getattr(caller.im_func, 'endpoint', None), Endpoint):
+                endpoint = caller.im_func.endpoint
                 try:
-                    permit = caller.im_func.endpoint.permissions[method]
+                    permit = endpoint.permissions[method]
                 except KeyError:
                     raise HTTPNotFound()
                 else:
                     if permit and not request.has_permission(permit):
                         raise HTTPForbidden()
                     else:
+                        timings.mark('permission')
                         if action and hasattr(caller, action):
                             # Bind action function to the caller's instance.
                             # The action method is not bound at the time the
@@ -218,7 +463,9 @@ class ApiFactory(dict):
                             # here.
                             caller = partial(getattr(caller, action),
                                              caller.im_self)
-                        return caller()
+                        result = self._call_endpoint(request, endpoint, caller, *args)
+                        timings.mark('call')
+                        return result
 
             # check if the caller has its own built-in process
             elif hasattr(caller, 'process'):
@@ -228,45 +475,97 @@ class ApiFactory(dict):
                 raise HTTPNotFound()
 
 
-    def register(self, service, name=''):
+    def register(self, service, name='', scope='request', pool_size=10, pool_timeout=30):
         """
         Exposes a given service to this API.
+
+        Classes are created per request by default, passing the request to
+        their constructor.  A `singleton` scope shares one instance across
+        the process and a `pooled` scope re-uses up to `pool_size` instances,
+        rejecting requests that wait more than `pool_timeout` seconds for one,
+        in both cases the class is constructed without arguments and its
+        endpoints are called with the request instead.
+
+        :param service: <variant>
+        :param name: <str>
+        :param scope: <str> 'request' || 'singleton' || 'pooled'
+        :param pool_size: <int>
+        :param pool_timeout: <float>
         """
+        try:
+            scope_type = SCOPES[scope]
+        except KeyError:
+            raise RuntimeError('Invalid service scope: {0}.'.format(scope))
+
+        # the cached documentation and routes are out of date once the
+        # services change
+        self.clear_cache()
+
         # expose a sub-factory
         if isinstance(service, ApiFactory):
             self.services[name] = (service.factory, None)
+            self.sections.pop(name, None)
+            self.indexes.pop(name, None)
+            self.__registrations[name] = None
 
         # expose a module dynamically as a service
         elif inspect.ismodule(service):
             name = name or service.__name__.split('.')[-1]
 
             # exclude endpoints with patterns
-            for obj in vars(service).values():
+            for attr, obj in vars(service).items():
                 endpoint = getattr(obj, 'endpoint', None)
                 if isinstance(endpoint, Endpoint) and endpoint.pattern:
-                    route = Route('', endpoint.pattern)
-                    self.routes.append((route, endpoint))
+                    self.add_route(endpoint)
+                    self.__route_registrations[endpoint.pattern] = (endpoint, '{0}:{1}'.format(service.__name__, attr))
 
             self.services[name] = (ModuleService, service)
+            self.__registrations[name] = {'type': 'module', 'import': service.__name__, 'object': service}
+            self.indexes[name] = ModuleService.build_index(service)
+
+            # the module documentation is rendered on first request
+            self.sections.pop(name, None)
 
         # expose a class dynamically as a service
         elif inspect.isclass(service):
             name = name or service.__name__
-            self.services[name] = (ClassService, service)
+            if scope_type is RequestScope:
+                self.services[name] = (ClassService, service)
+            elif scope_type is PooledScope:
+                self.services[name] = (ClassService, PooledScope(service, size=pool_size, timeout=pool_timeout))
+            else:
+                self.services[name] = (ClassService, scope_type(service))
+            self.indexes[name] = ClassService.build_index(service)
+            self.sections.pop(name, None)
+            self.__registrations[name] = {
+                'type': 'class',
+                'import': import_path(service),
+                'object': service,
+                'scope': scope,
+                'pool_size': pool_size,
+                'pool_timeout': pool_timeout
+            }
 
         # expose an endpoint directly
         elif isinstance(getattr(service, 'endpoint', None), Endpoint):
             if service.endpoint.pattern:
-                route = Route('', service.endpoint.pattern)
-                self.routes.append((route, service.endpoint))
+                self.add_route(service.endpoint)
+                self.__route_registrations[service.endpoint.pattern] = (service.endpoint, import_path(service))
             else:
                 self.services[service.endpoint.name] = (service.endpoint, None)
+                self.sections.pop(service.endpoint.name, None)
+                self.indexes.pop(service.endpoint.name, None)
+                self.__registrations[service.endpoint.name] = {
+                    'type': 'endpoint',
+                    'import': import_path(service),
+                    'object': service
+                }
 
         # expose a scope
         elif isinstance(service, dict):
             for srv in service.values():
                 try:
-                    self.register(srv)
+                    self.register(srv, scope=scope, pool_size=pool_size, pool_timeout=pool_timeout)
                 except RuntimeError:
                     pass
 
@@ -274,7 +573,7 @@ class ApiFactory(dict):
         elif isinstance(service, list):
             for srv in service:
                 try:
-                    self.register(srv)
+                    self.register(srv, scope=scope, pool_size=pool_size, pool_timeout=pool_timeout)
                 except RuntimeError:
                     pass
 
@@ -282,38 +581,109 @@ class ApiFactory(dict):
         else:
             raise RuntimeError('Invalid service provide: {0} ({1}).'.format(service, type(service)))
 
-    def handle_standard_error(self, request):
-        err = request.exception
+    def manifest(self):
+        """
+        Compiles the registered services into a manifest that can be saved
+        and loaded with `load_manifest` when the application starts.  Every
+        service must be importable by its module and name.
 
-        log.exception(err)
+        :return: <dict>
+        """
+        services = []
+        for name, registration in self.__registrations.items():
+            if registration is None or not is_importable(registration['import'], registration['object']):
+                raise RuntimeError('Service cannot be written to a manifest: {0}.'.format(name))
+
+            service_type, service_object = self.services[name]
+            entry = {key: value for key, value in registration.items() if key != 'object'}
+            entry['name'] = name
+
+            if isinstance(service_type, Endpoint):
+                entry['routes'] = {'/' + name: ','.join(sorted(service_type.callables.keys()))}
+                entry['endpoints'] = {name: describe(service_type)}
+            else:
+                index = self.indexes.get(name)
+                entry['routes'] = service_type.routes(service_object, name, index)
+                entry['endpoints'] = {key: describe(endpoint) for key, endpoint in index.items()}
 
-        status = getattr(err, 'status', projex.text.pretty(type(err).__name__))
-        code = getattr(err, 'code', 500)
+            services.append(entry)
 
-        request.response.status = '{0} {1}'.format(code, status)
+        routes = []
+        for pattern, (endpoint, path) in self.__route_registrations.items():
+            if not is_importable(path + '.endpoint', endpoint):
+                raise RuntimeError('Route cannot be written to a manifest: {0}.'.format(pattern))
+            routes.append({'pattern': pattern, 'import': path, 'methods': describe(endpoint)})
 
-        # for 500 errors, only return server error
-        if code / 100 == 5:
-            return {
-                'type': 'server_error',
-                'error': 'An unknown server error occurred.'
-            }
-        else:
-            return {
-                'type': projex.text.underscore(projex.text.underscore(type(err).__name__)),
-                'error': projex.text.nativestring(err)
-            }
+        return {'version': MANIFEST_VERSION, 'services': services, 'routes': routes}
 
-    def handle_http_error(self, request):
-        err = request.exception
+    def load_manifest(self, manifest):
+        """
+        Registers the services and routes listed in a manifest without
+        importing them.  Each one is imported and registered the first time
+        a request is routed to it, so the application should skip its own
+        registrations once `manifest_loaded` is set.
+
+        :param manifest: <dict>
+        """
+        if manifest.get('version') != MANIFEST_VERSION:
+            raise RuntimeError('Unsupported API manifest version: {0}'.format(manifest.get('version')))
+
+        self.clear_cache()
+        self.manifest_loaded = True
+
+        for entry in manifest['services']:
+            self.services[entry['name']] = (LazyService, entry)
+            self.sections.pop(entry['name'], None)
+            self.indexes.pop(entry['name'], None)
+
+        for route in manifest['routes']:
+            self.route_trie.add(route['pattern'], LazyEndpoint(route['import']))
+            self.__lazy_routes[route['pattern']] = ','.join(sorted(route['methods']))
+
+    def resolve_service(self, name):
+        """
+        Imports and registers a service that was loaded from a manifest.
+
+        :param name: <str>
+
+        :return: (<service type>, <service object>)
+        """
+        with self.__lock:
+            service_type, entry = self.services[name]
+            if service_type is LazyService:
+                self.register(resolve(entry['import']),
+                              name=entry['name'],
+                              scope=entry.get('scope', 'request'),
+                              pool_size=entry.get('pool_size', 10),
+                              pool_timeout=entry.get('pool_timeout', 30))
+            return self.services[name]
+
+    def handle_error(self, request):
+        """
+        Renders the exception raised while processing a request, where only
+        the type and message of client errors are returned.
 
-        log.exception(err)
+        :param request: <pyramid.request.Request>
 
-        status = getattr(err, 'status', projex.text.pretty(type(err).__name__))
+        :return: <dict>
+        """
+        err = request.exception
+        error_type, status = error_names(type(err))
+        status = getattr(err, 'status', status)
         code = getattr(err, 'code', 500)
 
+        self.error_log.log(err, code)
+
         request.response.status = '{0} {1}'.format(code, status)
 
+        # an endpoint's version tag describes the resource, not the error
+        request.response.etag = None
+
+        # let clients know when to retry a rejected request
+        retry_after = err.headers.get('Retry-After') if hasattr(err, 'headers') else None
+        if retry_after:
+            request.response.headers['Retry-After'] = retry_after
+
         # for 500 errors, only return server error
         if code / 100 == 5:
             return {
@@ -322,10 +692,28 @@ class ApiFactory(dict):
             }
         else:
             return {
-                'type': projex.text.underscore(projex.text.underscore(type(err).__name__)),
-                'error': projex.text.nativestring(err)
+                'type': error_type,
+                'error': nativestring(err)
             }
 
+    def handle_standard_error(self, request):
+        return self.handle_error(request)
+
+    def handle_http_error(self, request):
+        return self.handle_error(request)
+
+    def process_batch(self, request):
+        """
+        Runs the API requests posted to the batch route.
+
+        :param request: <pyramid.request.Request>
+
+        :return: [<dict>, ..]
+        """
+        if self.cors_options:
+            self.cors_setup(request)
+        return self.batch(request)
+
     def section_groups(self, request):
         intro = self.__documentation.introduction(self, request)
 
@@ -338,7 +726,15 @@ class ApiFactory(dict):
         sections = defaultdict(list)
 
         for name, service_info in sorted(self.services.items()):
-            for group_name, section in self.collect_documentation(name, service_info):
+            if service_info[0] is LazyService:
+                service_info = self.resolve_service(name)
+
+            try:
+                service_sections = self.sections[name]
+            except KeyError:
+                service_sections = self.sections[name] = list(self.collect_documentation(name, service_info))
+
+            for group_name, section in service_sections:
                 sections[group_name].append(section)
 
         # show topics first
@@ -371,11 +767,57 @@ class ApiFactory(dict):
         Serves this API from the inputted root path
         """
         route_name = route_name or path.replace('/', '.').strip('.')
-        path = path.strip('/') + '*traverse'
+        root = path.strip('/')
+        path = root + '*traverse'
 
         self.route_name = route_name
         self.base_permission = permission
 
+        # the batch route needs to be checked before the traversal route
+        if self.batch_path:
+            batch_route_name = route_name + '.batch'
+            config.add_route(batch_route_name, root + '/' + self.batch_path.strip('/'))
+            self.batch = BatchProcessor(root,
+                                        path=self.batch_path,
+                                        workers=self.batch_workers,
+                                        max_items=self.batch_max_items)
+            config.add_view(
+                self.process_batch,
+                route_name=batch_route_name,
+                request_method='POST',
+                renderer='json2',
+                **view_options
+            )
+            config.add_view(
+                self.handle_standard_error,
+                route_name=batch_route_name,
+                renderer='json2',
+                context=StandardError
+            )
+            config.add_view(
+                self.handle_http_error,
+                route_name=batch_route_name,
+                renderer='json2',
+                context=HTTPException
+            )
+
+            if self.cors_options:
+                config.add_view(
+                    self.cors_preflight,
+                    route_name=batch_route_name,
+                    request_method='OPTIONS'
+                )
+
+        if self.metrics_path:
+            metrics_route_name = route_name + '.metrics'
+            config.add_route(metrics_route_name, root + '/' + self.metrics_path.strip('/'))
+            config.add_view(
+                self.metrics_exposition,
+                route_name=metrics_route_name,
+                request_method='GET',
+                permission=self.metrics_permission
+            )
+
         # configure the route and the path
         config.add_route(route_name, path, factory=self.factory)
         config.add_view(
@@ -396,3 +838,10 @@ class ApiFactory(dict):
             renderer='json2',
             **view_options
         )
+
+        if self.cors_options:
+            config.add_view(
+                self.cors_preflight,
+                route_name=route_name,
+                request_method='OPTIONS'
+            )
@@ -0,0 +1,170 @@
+import json
+import threading
+import urllib
+
+from pyramid.httpexceptions import HTTPBadRequest
+from pyramid.request import Request
+
+# headers from the batch request that are passed along to each item so they
+# are authenticated the same way
+FORWARDED_HEADERS = ('Authorization', 'Cookie', 'Accept-Language')
+
+
+def encode_param(value):
+    """
+    Encodes the text of a path or query parameter from the batch JSON as
+    UTF-8, which urlencode would otherwise encode as ASCII, replacing other
+    characters.
+
+    :param value: <variant>
+
+    :return: <variant>
+    """
+    if isinstance(value, unicode):
+        return value.encode('utf-8')
+    elif isinstance(value, list):
+        return [encode_param(item) for item in value]
+    else:
+        return value
+
+
+class BatchProcessor(object):
+    """
+    Executes a list of API requests posted as a single JSON array, where each
+    item is a mapping of `method`, `path`, `params` and `body`.  The items are
+    dispatched in-process as sub-requests through the same route, traversal,
+    permission and view pipeline as a regular request and their results are
+    returned in order.
+
+    Consecutive GET items are independent of each other, so when `workers` is
+    greater than zero they are run concurrently on a bounded thread pool.
+    """
+    def __init__(self, root, path='batch', workers=0, max_items=50):
+        self.__lock = threading.Lock()
+        self.__pool = None
+
+        self.root = '/' + root.strip('/')
+        self.path = path.strip('/')
+        self.workers = workers
+        self.max_items = max_items
+
+    def __call__(self, request):
+        try:
+            items = request.json_body
+        except StandardError:
+            raise HTTPBadRequest('Batch body must be a JSON array')
+
+        if not isinstance(items, list):
+            raise HTTPBadRequest('Batch body must be a JSON array')
+        elif len(items) > self.max_items:
+            raise HTTPBadRequest('Batch requests are limited to {0} items'.format(self.max_items))
+
+        results = []
+        pending = []
+        for item in items:
+            if self.workers and isinstance(item, dict) and item.get('method', 'GET').upper() == 'GET':
+                pending.append(item)
+            else:
+                results.extend(self.run_concurrently(request, pending))
+                results.append(self.invoke(request, item))
+                pending = []
+
+        results.extend(self.run_concurrently(request, pending))
+        return results
+
+    def invoke(self, request, item):
+        """
+        Runs a single batch item as a sub-request.
+
+        :param request: <pyramid.request.Request>
+        :param item: <dict>
+
+        :return: {'status': <int>, 'body': <variant>}
+        """
+        try:
+            subrequest = self.subrequest(request, item)
+        except ValueError as err:
+            return {'status': 400, 'body': {'type': 'bad_request', 'error': str(err)}}
+
+        response = request.invoke_subrequest(subrequest, use_tweens=True)
+
+        if not response.body:
+            body = None
+        elif 'json' in (response.content_type or ''):
+            try:
+                body = json.loads(response.body)
+            except ValueError:
+                return {'status': 500, 'body': {'type': 'server_error', 'error': 'An unknown server error occurred.'}}
+        else:
+            body = response.text
+
+        return {'status': response.status_int, 'body': body}
+
+    def run_concurrently(self, request, items):
+        """
+        Runs the given GET items on the thread pool, returning their results
+        in order.
+
+        :param request: <pyramid.request.Request>
+        :param items: [<dict>, ..]
+
+        :return: [<dict>, ..]
+        """
+        if not items:
+            return []
+        elif len(items) == 1:
+            return [self.invoke(request, items[0])]
+        else:
+            return self.pool().map(lambda item: self.invoke(request, item), items)
+
+    def pool(self):
+        if self.__pool is None:
+            with self.__lock:
+                if self.__pool is None:
+                    from multiprocessing.pool import ThreadPool
+                    self.__pool = ThreadPool(self.workers)
+        return self.__pool
+
+    def subrequest(self, request, item):
+        """
+        Creates the sub-request for a batch item.
+
+        :param request: <pyramid.request.Request>
+        :param item: <dict>
+
+        :return: <pyramid.request.Request>
+        """
+        if not isinstance(item, dict) or not item.get('path'):
+            raise ValueError('Batch items must define a path')
+
+        path = '/' + encode_param(item['path']).strip('/')
+        if path == self.root or path.startswith(self.root + '/'):
+            path = path[len(self.root):]
+        if path.split('?')[0].strip('/') == self.path:
+            raise ValueError('Batch requests cannot be nested')
+
+        url = self.root + path
+        params = item.get('params')
+        if params:
+            if isinstance(params, dict):
+                params = params.items()
+            query = [(encode_param(k), encode_param(v)) for k, v in params]
+            url += ('&' if '?' in url else '?') + urllib.urlencode(query, doseq=True)
+
+        subrequest = Request.blank(url, base_url=request.application_url)
+        subrequest.method = item.get('method', 'GET').upper()
+        subrequest.accept = 'application/json'
+
+        # results are embedded in the batch response, which is compressed
+        # as a whole, so each item needs to be returned as plain JSON
+        subrequest.headers['Accept-Encoding'] = 'identity'
+
+        for header in FORWARDED_HEADERS:
+            if header in request.headers:
+                subrequest.headers[header] = request.headers[header]
+
+        if item.get('body') is not None:
+            subrequest.content_type = 'application/json'
+            subrequest.body = json.dumps(item['body'])
+
+        return subrequest
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from collections import OrderedDict
+
+
+def default_key(request):
+    """
+    Generates the default cache key for a request, made up of its method,
+    path, sorted parameters and effective principals.
+
+    :param request: <pyramid.request.Request>
+
+    :return: <tuple>
+    """
+    return (
+        request.method,
+        request.path_info,
+        tuple(sorted(request.params.items())),
+        tuple(sorted(request.effective_principals))
+    )
+
+
+class ResponseCache(object):
+    """
+    Thread-safe, in-process cache of endpoint results.  Entries expire after
+    `ttl` seconds and the least recently used entries are evicted once the
+    cache holds `max_entries` results.
+    """
+    def __init__(self, ttl=60, max_entries=1000, key=None):
+        self.__lock = threading.Lock()
+        self.__entries = OrderedDict()
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key = key or default_key
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def clear(self):
+        """
+        Removes all the cached results.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def get(self, key, default=None):
+        """
+        Returns the cached result for the given key, or the default value
+        when no valid entry exists.
+
+        :param key: <hashable>
+        :param default: <variant>
+
+        :return: <variant>
+        """
+        with self.__lock:
+            try:
+                expires, value = self.__entries.pop(key)
+            except KeyError:
+                return default
+
+            if expires < time.time():
+                return default
+
+            # re-insert the entry to mark it as the most recently used
+            self.__entries[key] = (expires, value)
+            return value
+
+    def set(self, key, value):
+        """
+        Caches the result for the given key.
+
+        :param key: <hashable>
+        :param value: <variant>
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+            while self.__entries and len(self.__entries) >= self.max_entries:
+                self.__entries.popitem(last=False)
+            self.__entries[key] = (time.time() + self.ttl, value)
+
+    @classmethod
+    def create(cls, options):
+        """
+        Creates a new cache from the `cache=` option of an endpoint, which
+        can be a cache instance, a TTL in seconds or a dictionary of keyword
+        arguments for this class.
+
+        :param options: <ResponseCache> || <int> || <dict> || None
+
+        :return: <ResponseCache> || None
+        """
+        if options is None or options is False:
+            return None
+        elif isinstance(options, ResponseCache):
+            return options
+        elif options is True:
+            return cls()
+        elif isinstance(options, dict):
+            return cls(**options)
+        else:
+            return cls(ttl=options)
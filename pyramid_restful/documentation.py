@@ -1,54 +1,79 @@
-import markdown
 import re
-from jinja2 import Environment, PackageLoader
 
+from .cache import ResponseCache
 
-class Section(object):
-    def __init__(self, id='', name='', methods=None):
-        self.id = id
-        self.name = name
-        self.methods = []
 
-        for help_content, example_content in methods or []:
-            if example_content is '':
-                parts = help_content.split('{example}')
-                if len(parts) % 2 == 1:
-                    parts.append('')
+# precompiled patterns used when converting example content to HTML
+LANGUAGE_BLOCK = re.compile('```(?P<lang>[\w-]+)')
+CLOSE_BLOCK = re.compile('```')
+PLAIN_CODE = re.compile('<pre><code>')
+BARE_PRE = re.compile('<pre>(?!<code[^>]*>)')
+UNCODED_PRE = re.compile('<pre>(?!<code>)')
+CLOSE_PRE = re.compile('(?!</code>)</pre>')
+
+
+def render_example(md, content, split=True):
+    """
+    Converts the markdown example content to HTML, wrapping its code blocks
+    so they can be syntax highlighted.
+
+    :param md: <markdown.Markdown>
+    :param content: <str>
+    :param split: <bool> whether or not this example came from a split docstring
+
+    :return: <unicode>
+    """
+    content = LANGUAGE_BLOCK.sub('<pre><code class="\g<lang>">', content)
+    content = CLOSE_BLOCK.sub('\n</code></pre>', content)
+
+    content = md.reset().convert(content)
+
+    if split:
+        content = PLAIN_CODE.sub('<pre><code class="python">', content)
+        content = BARE_PRE.sub('<pre><code class="python">', content)
+    else:
+        content = UNCODED_PRE.sub('<pre><code class="python">', content)
+    return CLOSE_PRE.sub('</code></pre>', content)
 
-                for i in xrange(0, len(parts), 2):
-                    h = parts[i]
-                    e = parts[i+1]
 
-                    # replace language content
-                    e = re.sub('```(?P<lang>[\w-]+)', '<pre><code class="\g<lang>">', e)
-                    e = re.sub('```', '\n</code></pre>', e)
+def render_methods(methods):
+    """
+    Pre-renders the (help, example) markdown pairs for a section into the
+    (index, help HTML, example HTML) fragments used by the documentation
+    template.
 
-                    e = markdown.markdown(e)
+    :param methods: [(<str> help, <str> example), ..]
 
-                    e = re.sub('<pre><code>', '<pre><code class="python">', e)
-                    e = re.sub('<pre>(?!<code[^>]*>)', '<pre><code class="python">', e)
-                    e = re.sub('(?!</code>)</pre>', '</code></pre>', e)
+    :return: [(<int>, <unicode>, <unicode>), ..]
+    """
+    import markdown
 
-                    self.methods.append((
-                        len(self.methods),
-                        markdown.markdown(h),
-                        e
-                    ))
-            else:
-                # replace language content
-                example_content = re.sub('```(?P<lang>[\w-]+)', '<pre><code class="\g<lang>">', example_content)
-                example_content = re.sub('```', '\n</code></pre>', example_content)
+    md = markdown.Markdown()
+    output = []
 
-                example_content = markdown.markdown(example_content)
+    for help_content, example_content in methods or []:
+        if example_content is '':
+            parts = help_content.split('{example}')
+            if len(parts) % 2 == 1:
+                parts.append('')
 
-                example_content = re.sub('<pre>(?!<code>)', '<pre><code class="python">', example_content)
-                example_content = re.sub('(?!</code>)</pre>', '</code></pre>', example_content)
+            for i in xrange(0, len(parts), 2):
+                example = render_example(md, parts[i+1])
+                output.append((len(output), md.reset().convert(parts[i]), example))
+        else:
+            example = render_example(md, example_content, split=False)
+            output.append((len(output), md.reset().convert(help_content), example))
 
-                self.methods.append((
-                    len(self.methods),
-                    markdown.markdown(help_content),
-                    example_content
-                ))
+    return output
+
+
+class Section(object):
+    __slots__ = ('id', 'name', 'methods')
+
+    def __init__(self, id='', name='', methods=None):
+        self.id = id
+        self.name = name
+        self.methods = render_methods(methods)
 
 
 class SectionGroup(object):
@@ -58,8 +83,35 @@ class SectionGroup(object):
 
 
 class Documentation(object):
-    def __init__(self, package, folder, template):
-        self.__environment = Environment(loader=PackageLoader(package, folder))
+    def __init__(self, package, folder, template, cache=True, cache_size=16):
+        self.__package = package
+        self.__folder = folder
+        self.__environment = None
+
+        # the API url comes from the request's host, so only the most
+        # recently used ones are kept
+        self.__cache = ResponseCache(ttl=3600, max_entries=cache_size)
+
+        self.cache = cache
+
+    def environment(self):
+        """
+        Returns the template environment, only loading jinja2 the first time
+        documentation is rendered.
+
+        :return: <jinja2.Environment>
+        """
+        if self.__environment is None:
+            from jinja2 import Environment, PackageLoader
+            self.__environment = Environment(loader=PackageLoader(self.__package, self.__folder))
+        return self.__environment
+
+    def clear_cache(self):
+        """
+        Clears the rendered documentation, forcing it to be rebuilt the
+        next time it is requested.
+        """
+        self.__cache.clear()
 
     def options(self, api, request):
         opts = {
@@ -71,7 +123,7 @@ class Documentation(object):
     def introduction(self, api, request):
         options = self.options(api, request)
 
-        help_template = self.__environment.get_template('introduction.md.jinja')
+        help_template = self.environment().get_template('introduction.md.jinja')
         help_content = help_template.render(**options)
 
         #example_template = self.__environment.get_template('intro_example.md.jinja')
@@ -86,7 +138,20 @@ class Documentation(object):
 
 
     def render(self, api, request):
-        template = self.__environment.get_template('documentation.html.jinja')
         options = self.options(api, request)
+
+        # documentation only changes when the API services do, so re-use the
+        # rendered output for the same API url
+        url = options['url']
+        if self.cache:
+            body = self.__cache.get(url)
+            if body is not None:
+                return body
+
+        template = self.environment().get_template('documentation.html.jinja')
         options['section_groups'] = api.section_groups(request)
-        return template.render(**options)
\ No newline at end of file
+        body = template.render(**options)
+
+        if self.cache:
+            self.__cache.set(url, body)
+        return body
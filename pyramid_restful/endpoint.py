@@ -1,20 +1,36 @@
 
+from .cache import ResponseCache
+from .limits import ConcurrencyLimit
+from .pagination import Paginator
+
+
 class Endpoint(object):
 
-    def __init__(self, callable, name='', method='get', permission=None, pattern=None, action=None):
+    def __init__(self, callable, name='', method='get', permission=None, pattern=None, action=None, cache=None,
+                 etag=None, max_concurrency=None, queue_timeout=0, paginate=None):
         self.name = name or callable.__name__
         self.callables = {}
         self.permissions = {}
+        self.caches = {}
+        self.etags = {}
+        self.limits = {}
+        self.paginators = {}
         self.pattern = pattern
-        self._setup(callable, method=method, permission=permission)
+        self._setup(callable, method=method, permission=permission, cache=cache, etag=etag,
+                    max_concurrency=max_concurrency, queue_timeout=queue_timeout, paginate=paginate)
 
-    def _setup(self, callable, method='get', permission=None, action=None):
+    def _setup(self, callable, method='get', permission=None, action=None, cache=None, etag=None,
+               max_concurrency=None, queue_timeout=0, paginate=None):
 
         if action:
             setattr(self.callables[method.lower()], action, callable)
 
         else:
             self.callables[method.lower()] = callable
+            self.caches[method.lower()] = ResponseCache.create(cache)
+            self.etags[method.lower()] = etag
+            self.limits[method.lower()] = ConcurrencyLimit.create(max_concurrency, queue_timeout)
+            self.paginators[method.lower()] = Paginator.create(paginate)
 
         self.permissions[method.lower()] = permission
         callable.endpoint = self
@@ -33,34 +49,40 @@ class Endpoint(object):
                                action=action_name)
         return setup
 
-    def method(self, method='get', permission=None):
+    def method(self, method='get', permission=None, max_concurrency=None, queue_timeout=0):
         def setup(callable):
-            return self._setup(callable, method=method, permission=permission)
+            return self._setup(callable, method=method, permission=permission,
+                               max_concurrency=max_concurrency, queue_timeout=queue_timeout)
         return setup
 
-    def get(self, permission=None):
+    def get(self, permission=None, cache=None, etag=None, max_concurrency=None, queue_timeout=0, paginate=None):
         def setup(callable):
-            return self._setup(callable, method='get', permission=permission)
+            return self._setup(callable, method='get', permission=permission, cache=cache, etag=etag,
+                               max_concurrency=max_concurrency, queue_timeout=queue_timeout, paginate=paginate)
         return setup
 
-    def post(self, permission=None):
+    def post(self, permission=None, max_concurrency=None, queue_timeout=0):
         def setup(callable):
-            return self._setup(callable, method='post', permission=permission)
+            return self._setup(callable, method='post', permission=permission,
+                               max_concurrency=max_concurrency, queue_timeout=queue_timeout)
         return setup
 
-    def delete(self, permission=None):
+    def delete(self, permission=None, max_concurrency=None, queue_timeout=0):
         def setup(callable):
-            return self._setup(callable, method='delete', permission=permission)
+            return self._setup(callable, method='delete', permission=permission,
+                               max_concurrency=max_concurrency, queue_timeout=queue_timeout)
         return setup
 
-    def patch(self, permission=None):
+    def patch(self, permission=None, max_concurrency=None, queue_timeout=0):
         def setup(callable):
-            return self._setup(callable, method='patch', permission=permission)
+            return self._setup(callable, method='patch', permission=permission,
+                               max_concurrency=max_concurrency, queue_timeout=queue_timeout)
         return setup
 
-    def put(self, permission=None):
+    def put(self, permission=None, max_concurrency=None, queue_timeout=0):
         def setup(callable):
-            return self._setup(callable, method='put', permission=permission)
+            return self._setup(callable, method='put', permission=permission,
+                               max_concurrency=max_concurrency, queue_timeout=queue_timeout)
         return setup
 
 
@@ -0,0 +1,196 @@
+import logging
+import Queue
+import random
+import threading
+
+# default log levels for errors by status class, server errors are logged with
+# their traceback while client errors are routine
+DEFAULT_LEVELS = {
+    '4xx': logging.INFO,
+    '5xx': logging.ERROR
+}
+
+_ERROR_NAMES = {}
+_PROJEX_TEXT = None
+
+
+def projex_text():
+    """
+    Returns the projex.text module, importing it the first time an error is
+    handled and keeping it so later errors skip the import machinery.
+
+    :return: <module>
+    """
+    global _PROJEX_TEXT
+    if _PROJEX_TEXT is None:
+        import projex.text
+        _PROJEX_TEXT = projex.text
+    return _PROJEX_TEXT
+
+
+def error_names(cls):
+    """
+    Returns the `type` and `status` strings reported for an exception class,
+    computing them once per class.
+
+    :param cls: <subclass of Exception>
+
+    :return: (<str> type, <str> status)
+    """
+    try:
+        return _ERROR_NAMES[cls]
+    except KeyError:
+        text = projex_text()
+        names = (text.underscore(text.underscore(cls.__name__)), text.pretty(cls.__name__))
+        _ERROR_NAMES[cls] = names
+        return names
+
+
+def nativestring(err):
+    """
+    Returns the message of an error as a native string.
+
+    :param err: <Exception>
+
+    :return: <str>
+    """
+    return projex_text().nativestring(err)
+
+
+class ErrorLog(object):
+    """
+    Logs the errors raised while processing requests.  Each status code, or
+    status class such as `4xx`, can be given its own log level.  Server
+    errors are always logged with their traceback, while the traceback of
+    client errors is only included for a sampled fraction of them, as
+    formatting it is most of the cost of logging.
+    """
+    def __init__(self, logger, levels=None, traceback_sample_rate=0.0):
+        self.logger = logger
+        self.levels = dict(DEFAULT_LEVELS)
+        self.levels.update(levels or {})
+        self.traceback_sample_rate = traceback_sample_rate
+
+    def level(self, code):
+        """
+        Returns the log level for the given status code.
+
+        :param code: <int>
+
+        :return: <int>
+        """
+        try:
+            return self.levels[str(code)]
+        except KeyError:
+            return self.levels.get('{0}xx'.format(code / 100), logging.ERROR)
+
+    def log(self, err, code):
+        """
+        Logs the given error.
+
+        :param err: <Exception>
+        :param code: <int> status code of the response
+        """
+        level = self.level(code)
+        if not self.logger.isEnabledFor(level):
+            return
+
+        if code >= 500:
+            exc_info = True
+        else:
+            exc_info = self.traceback_sample_rate > 0 and random.random() < self.traceback_sample_rate
+
+        self.logger.log(level, '%s %s: %s', code, type(err).__name__, nativestring(err), exc_info=exc_info)
+
+    @classmethod
+    def from_settings(cls, logger, settings):
+        """
+        Creates the error log from the `restful.errors.*` settings, where
+        `restful.errors.level.<status>` sets the level of a status code or
+        class and `restful.errors.traceback_sample_rate` the fraction of
+        client errors logged with their traceback.
+
+        :param logger: <logging.Logger>
+        :param settings: <dict>
+
+        :return: <ErrorLog>
+        """
+        levels = {}
+        for key, value in settings.items():
+            if key.startswith('restful.errors.level.'):
+                level = logging.getLevelName(value.upper())
+                if not isinstance(level, int):
+                    raise RuntimeError('Invalid log level for {0}: {1}'.format(key, value))
+                levels[key.replace('restful.errors.level.', '')] = level
+
+        return cls(logger,
+                   levels=levels,
+                   traceback_sample_rate=float(settings.get('restful.errors.traceback_sample_rate', 0)))
+
+
+class QueueHandler(logging.Handler):
+    """
+    Log handler that hands records off to a background thread, which emits
+    them on the wrapped handlers, so that request threads never block on
+    writing logs.  Records are dropped, and counted, when the queue is full.
+    """
+    def __init__(self, handlers, maxsize=10000):
+        super(QueueHandler, self).__init__()
+
+        self.handlers = list(handlers)
+        self.queue = Queue.Queue(maxsize)
+        self.dropped = 0
+
+        self.__thread = threading.Thread(target=self.__run, name='pyramid_restful.log')
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def emit(self, record):
+        try:
+            # merge the message arguments now, as they may change once the
+            # request has moved on, the traceback is formatted by the listener
+            record.msg = record.getMessage()
+            record.args = None
+
+            try:
+                self.queue.put_nowait(record)
+            except Queue.Full:
+                self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def __run(self):
+        while True:
+            record = self.queue.get()
+            for handler in self.handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+            self.queue.task_done()
+
+    @classmethod
+    def install(cls, logger):
+        """
+        Moves the handlers that receive the records of the given logger,
+        including those of the ancestors its records propagate to, behind a
+        queue handler.
+
+        :param logger: <logging.Logger>
+
+        :return: <QueueHandler>
+        """
+        for handler in logger.handlers:
+            if isinstance(handler, cls):
+                return handler
+
+        handlers = []
+        current = logger
+        while current is not None:
+            handlers += current.handlers
+            if not current.propagate:
+                break
+            current = current.parent
+
+        handler = cls(handlers)
+        logger.handlers = [handler]
+        logger.propagate = False
+        return handler
@@ -0,0 +1,73 @@
+from collections import Iterator, Mapping
+
+
+class FieldSet(object):
+    """
+    Sparse fieldset requested by a client, such as `?fields=id,name,address.city`,
+    where nested fields are separated by periods.  It is available to
+    endpoints as `request.fields` so they can limit what they load, and the
+    json2 renderer prunes results down to the requested fields before they
+    are serialized.
+    """
+    def __init__(self, paths=()):
+        self.tree = {}
+        for path in paths:
+            node = self.tree
+            for name in path.strip().split('.'):
+                if name:
+                    node = node.setdefault(name, {})
+
+    def __contains__(self, name):
+        return name in self.tree
+
+    def __iter__(self):
+        return iter(self.tree)
+
+    def prune(self, value):
+        """
+        Returns the value reduced to the requested fields.  Mappings are
+        reduced to the requested keys, lists and iterators have each of their
+        items pruned and objects providing `__json__` are converted first.
+
+        :param value: <variant>
+
+        :return: <variant>
+        """
+        return _prune(value, self.tree)
+
+    @classmethod
+    def factory(cls, param='fields'):
+        """
+        Returns a request method creating the fieldset from the given query
+        parameter, or None when the client did not request one.
+
+        :param param: <str>
+
+        :return: <callable>
+        """
+        def create(request):
+            if not param:
+                return None
+
+            values = request.GET.getall(param)
+            if not values:
+                return None
+            return cls(path for value in values for path in value.split(','))
+        return create
+
+
+def _prune(value, tree):
+    if not tree or value is None or isinstance(value, (basestring, int, long, float, bool)):
+        return value
+    elif isinstance(value, Mapping):
+        return {key: _prune(value[key], subtree) for key, subtree in tree.items() if key in value}
+    elif isinstance(value, (list, tuple)):
+        return [_prune(item, tree) for item in value]
+    elif isinstance(value, Iterator):
+        return (_prune(item, tree) for item in value)
+
+    method = getattr(value, '__json__', None)
+    if method is None:
+        return value
+    else:
+        return _prune(method(), tree)
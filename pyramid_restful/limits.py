@@ -0,0 +1,138 @@
+import math
+import threading
+import time
+
+
+class ConcurrencyLimit(object):
+    """
+    Bounds the number of requests an endpoint method processes at once.  When
+    the limit is reached, further requests wait up to `queue_timeout` seconds
+    for a slot to free up and are rejected after that, so that a spike on one
+    expensive endpoint cannot tie up every worker thread.
+    """
+    def __init__(self, max_concurrency, queue_timeout=0):
+        self.__condition = threading.Condition(threading.Lock())
+
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    @property
+    def retry_after(self):
+        """
+        Returns the number of seconds a rejected client is asked to wait
+        before retrying.
+
+        :return: <int>
+        """
+        return max(int(math.ceil(self.queue_timeout)), 1)
+
+    def acquire(self):
+        """
+        Claims a slot for a request, waiting for one to be released when the
+        limit has been reached.
+
+        :return: <bool> whether or not a slot was claimed
+        """
+        with self.__condition:
+            if self.active < self.max_concurrency:
+                self.active += 1
+                return True
+
+            deadline = time.time() + self.queue_timeout
+            self.waiting += 1
+            try:
+                while self.active >= self.max_concurrency:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self.__condition.wait(remaining)
+
+                self.active += 1
+                return True
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        with self.__condition:
+            self.active -= 1
+            self.__condition.notify()
+
+    def snapshot(self):
+        """
+        Returns the current state of this limit.
+
+        :return: <dict>
+        """
+        return {
+            'active': self.active,
+            'queued': self.waiting,
+            'rejected': self.rejected
+        }
+
+    def wrap(self, iterator):
+        """
+        Returns a streamed result that holds on to the claimed slot until it
+        has been read.
+
+        :param iterator: <iter>
+
+        :return: <ReleasingIterator>
+        """
+        return ReleasingIterator(iterator, self.release)
+
+    @classmethod
+    def create(cls, max_concurrency=None, queue_timeout=0):
+        """
+        Creates the limit for the given endpoint options, returning None when
+        the endpoint is not limited.
+
+        :param max_concurrency: <int> or None
+        :param queue_timeout: <float>
+
+        :return: <ConcurrencyLimit> or None
+        """
+        if not max_concurrency:
+            return None
+        else:
+            return cls(max_concurrency, queue_timeout=queue_timeout)
+
+
+class ReleasingIterator(object):
+    """
+    Streamed result that holds on to a resource of the request, such as an
+    endpoint's concurrency slot or a pooled service instance, while its rows
+    are read and releases it once the result is exhausted, closed or
+    discarded.
+    """
+    def __init__(self, iterator, release):
+        self.__iterator = iterator
+        self.__release = release
+
+    def __iter__(self):
+        return self
+
+    def __del__(self):
+        self.close()
+
+    def next(self):
+        try:
+            return next(self.__iterator)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        release, self.__release = self.__release, None
+        if release is None:
+            return
+
+        try:
+            close = getattr(self.__iterator, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            release()
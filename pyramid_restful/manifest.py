@@ -0,0 +1,178 @@
+"""
+Compiles the services registered with an API into a manifest file, which an
+application can load at startup instead of importing and scanning every
+service module:
+
+    python -m pyramid_restful.manifest production.ini api-manifest.json
+
+and then in the application settings:
+
+    restful.manifest = myapp:api-manifest.json
+
+Services listed in the manifest are only imported the first time a request
+is routed to them, so the application should only register its own services
+when no manifest was loaded:
+
+    if not config.registry.rest_api.manifest_loaded:
+        config.registry.rest_api.register(services)
+
+The `restful.manifest` setting is ignored while the manifest is being built,
+so that every service is registered and written to it.
+"""
+import importlib
+import inspect
+import json
+import sys
+
+MANIFEST_VERSION = 1
+
+# whether or not the application is being loaded to build its manifest
+_BUILDING = False
+
+
+def building():
+    """
+    Returns whether or not the application is being loaded to build its
+    manifest, in which case the `restful.manifest` setting is ignored.
+
+    :return: <bool>
+    """
+    return _BUILDING
+
+
+def import_path(obj):
+    """
+    Returns the path the given module, class or function is imported from.
+
+    :param obj: <module> || <type> || <function>
+
+    :return: <str> such as `package.module` or `package.module:name`
+    """
+    if inspect.ismodule(obj):
+        return obj.__name__
+    else:
+        return '{0}:{1}'.format(obj.__module__, obj.__name__)
+
+
+def resolve(path):
+    """
+    Imports the object at the given import path.
+
+    :param path: <str>
+
+    :return: <variant>
+    """
+    module_name, _, attr = path.partition(':')
+    obj = importlib.import_module(module_name)
+    for name in attr.split('.') if attr else ():
+        obj = getattr(obj, name)
+    return obj
+
+
+def is_importable(path, obj):
+    """
+    Returns whether or not the given import path leads back to the object.
+
+    :param path: <str>
+    :param obj: <variant>
+
+    :return: <bool>
+    """
+    try:
+        return resolve(path) is obj
+    except (ImportError, AttributeError):
+        return False
+
+
+def describe(endpoint):
+    """
+    Returns the methods of an endpoint mapped to the permission they require.
+
+    :param endpoint: <pyramid_restful.endpoint.Endpoint>
+
+    :return: {<str> method: <str> || None, ..}
+    """
+    return {
+        method: str(permission) if permission is not None else None
+        for method, permission in endpoint.permissions.items()
+    }
+
+
+class LazyService(object):
+    """
+    Placeholder for a service listed in a manifest that has not been imported
+    yet, stored in the API services along with its manifest entry.
+    """
+    pass
+
+
+class LazyEndpoint(object):
+    """
+    Placeholder for a patterned endpoint listed in a manifest, which imports
+    its function the first time the pattern is matched.
+    """
+    __slots__ = ('path', 'endpoint')
+
+    def __init__(self, path):
+        self.path = path
+        self.endpoint = None
+
+    def resolve(self):
+        if self.endpoint is None:
+            self.endpoint = resolve(self.path).endpoint
+        return self.endpoint
+
+
+def read_manifest(spec):
+    """
+    Reads the manifest from a file path or asset specification.
+
+    :param spec: <str>
+
+    :return: <dict>
+    """
+    from pyramid.path import AssetResolver
+
+    with open(AssetResolver().resolve(spec).abspath()) as f:
+        manifest = json.load(f)
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise RuntimeError('Unsupported API manifest version: {0}'.format(manifest.get('version')))
+    return manifest
+
+
+def write_manifest(api, path):
+    """
+    Writes the manifest for the given API to a file.
+
+    :param api: <pyramid_restful.api.ApiFactory>
+    :param path: <str>
+    """
+    with open(path, 'w') as f:
+        json.dump(api.manifest(), f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    global _BUILDING
+    from pyramid.paster import bootstrap
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print >> sys.stderr, 'usage: python -m pyramid_restful.manifest <config_uri> <output>'
+        return 1
+
+    _BUILDING = True
+    try:
+        env = bootstrap(argv[0])
+    finally:
+        _BUILDING = False
+
+    try:
+        write_manifest(env['registry'].rest_api, argv[1])
+    finally:
+        env['closer']()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,450 @@
+import bisect
+import copy
+import errno
+import json
+import os
+import threading
+import time
+
+# latency histogram bucket upper bounds, in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# the phases of a request that are timed, in the order they occur
+PHASES = ('traversal', 'permission', 'call', 'render', 'total')
+
+
+class Histogram(object):
+    __slots__ = ('counts', 'count', 'sum')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """
+        Returns the cumulative bucket counts for this histogram.
+
+        :return: <dict>
+        """
+        buckets = []
+        total = 0
+        for bound, count in zip(BUCKETS + ('+Inf',), self.counts):
+            total += count
+            buckets.append((bound, total))
+        return {'count': self.count, 'sum': self.sum, 'buckets': buckets}
+
+
+class EndpointMetrics(object):
+    """
+    Call and error counts along with the latency histograms of each request
+    phase for a single endpoint and HTTP method.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.error_types = {}
+        self.in_flight = 0
+        self.latency = {phase: Histogram() for phase in PHASES}
+        self.limit = None
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def record(self, timings, error=None):
+        """
+        Records a finished request, where `error` is the exception it raised.
+
+        :param timings: <RequestTimings>
+        :param error: <Exception> or None
+        """
+        with self.lock:
+            self.calls += 1
+            self.in_flight = max(self.in_flight - 1, 0)
+            if error is not None:
+                error_type = type(error).__name__
+                self.errors += 1
+                self.error_types[error_type] = self.error_types.get(error_type, 0) + 1
+            for phase, value in timings.phases.items():
+                self.latency[phase].observe(value)
+
+    def snapshot(self):
+        with self.lock:
+            output = {
+                'calls': self.calls,
+                'errors': self.errors,
+                'error_types': dict(self.error_types),
+                'in_flight': self.in_flight,
+                'latency': {phase: hist.snapshot() for phase, hist in self.latency.items()}
+            }
+
+        # include the queue of endpoints with a concurrency limit
+        if self.limit is not None:
+            limit = self.limit.snapshot()
+            output['queued'] = limit['queued']
+            output['rejected'] = limit['rejected']
+        return output
+
+
+class RequestTimings(object):
+    """
+    Tracks the time spent in each phase of a single request.  Each call to
+    `mark` records the time since the previous mark against the given phase.
+    """
+    __slots__ = ('start', 'last', 'phases', 'endpoint')
+
+    def __init__(self):
+        self.start = self.last = time.time()
+        self.phases = {}
+        self.endpoint = None
+
+    def mark(self, phase):
+        now = time.time()
+        self.phases[phase] = self.phases.get(phase, 0) + (now - self.last)
+        self.last = now
+
+    def finish(self):
+        self.mark('render')
+        self.phases['total'] = self.last - self.start
+
+
+class NullTimings(object):
+    """
+    Stand-in used when metrics are disabled so instrumented code does not
+    need to check for them.
+    """
+    __slots__ = ()
+
+    def mark(self, phase):
+        pass
+
+
+NULL_TIMINGS = NullTimings()
+
+
+def endpoint_name(request):
+    """
+    Returns the name metrics are recorded under for the endpoint of a
+    request, which is its pattern for pattern routes or the traversed path.
+
+    :param request: <pyramid.request.Request>
+
+    :return: <str>
+    """
+    endpoint = getattr(request, 'endpoint', None)
+    if endpoint is not None and endpoint.pattern:
+        return endpoint.pattern
+    else:
+        return '/' + '/'.join(request.traversed)
+
+
+def merge(snapshots):
+    """
+    Combines the metric snapshots of several workers into one.
+
+    :param snapshots: [<dict>, ..]
+
+    :return: <dict>
+    """
+    output = {}
+    for snapshot in snapshots:
+        for name, methods in snapshot.items():
+            for method, data in methods.items():
+                target = output.setdefault(name, {}).get(method)
+                if target is None:
+                    output[name][method] = copy.deepcopy(data)
+                    continue
+
+                for key in ('calls', 'errors', 'in_flight', 'queued', 'rejected'):
+                    if key in data:
+                        target[key] = target.get(key, 0) + data[key]
+                for error_type, count in data['error_types'].items():
+                    target['error_types'][error_type] = target['error_types'].get(error_type, 0) + count
+                for phase, hist in data['latency'].items():
+                    target_hist = target['latency'][phase]
+                    target_hist['count'] += hist['count']
+                    target_hist['sum'] += hist['sum']
+                    target_hist['buckets'] = [(bound, total + other[1])
+                                              for (bound, total), other in zip(target_hist['buckets'],
+                                                                               hist['buckets'])]
+    return output
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    else:
+        return str(value)
+
+
+def _format_labels(**labels):
+    escaped = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        escaped.append('{0}="{1}"'.format(key, value))
+    return '{' + ','.join(escaped) + '}'
+
+
+def exposition(snapshot, prefix='restful'):
+    """
+    Renders a metrics snapshot in the Prometheus text exposition format.
+
+    :param snapshot: <dict>
+    :param prefix: <str>
+
+    :return: <str>
+    """
+    endpoints = [(name, method, snapshot[name][method])
+                 for name in sorted(snapshot)
+                 for method in sorted(snapshot[name])]
+
+    lines = [
+        '# HELP {0}_requests_total Requests processed by each API endpoint.'.format(prefix),
+        '# TYPE {0}_requests_total counter'.format(prefix)
+    ]
+    for name, method, data in endpoints:
+        labels = _format_labels(endpoint=name, method=method)
+        lines.append('{0}_requests_total{1} {2}'.format(prefix, labels, data['calls']))
+
+    lines += [
+        '# HELP {0}_requests_in_flight Requests currently being processed by each API endpoint.'.format(prefix),
+        '# TYPE {0}_requests_in_flight gauge'.format(prefix)
+    ]
+    for name, method, data in endpoints:
+        labels = _format_labels(endpoint=name, method=method)
+        lines.append('{0}_requests_in_flight{1} {2}'.format(prefix, labels, data['in_flight']))
+
+    lines += [
+        '# HELP {0}_request_errors_total Requests to each API endpoint that raised an error, by type.'.format(prefix),
+        '# TYPE {0}_request_errors_total counter'.format(prefix)
+    ]
+    for name, method, data in endpoints:
+        for error_type, count in sorted(data['error_types'].items()):
+            labels = _format_labels(endpoint=name, method=method, type=error_type)
+            lines.append('{0}_request_errors_total{1} {2}'.format(prefix, labels, count))
+
+    lines += [
+        '# HELP {0}_requests_queued Requests waiting for a concurrency limited API endpoint.'.format(prefix),
+        '# TYPE {0}_requests_queued gauge'.format(prefix)
+    ]
+    for name, method, data in endpoints:
+        if 'queued' in data:
+            labels = _format_labels(endpoint=name, method=method)
+            lines.append('{0}_requests_queued{1} {2}'.format(prefix, labels, data['queued']))
+
+    lines += [
+        '# HELP {0}_requests_rejected_total Requests rejected by a concurrency limited API endpoint.'.format(prefix),
+        '# TYPE {0}_requests_rejected_total counter'.format(prefix)
+    ]
+    for name, method, data in endpoints:
+        if 'rejected' in data:
+            labels = _format_labels(endpoint=name, method=method)
+            lines.append('{0}_requests_rejected_total{1} {2}'.format(prefix, labels, data['rejected']))
+
+    lines += [
+        '# HELP {0}_request_duration_seconds Time spent in each phase of a request.'.format(prefix),
+        '# TYPE {0}_request_duration_seconds histogram'.format(prefix)
+    ]
+    for name, method, data in endpoints:
+        for phase in PHASES:
+            hist = data['latency'][phase]
+            for bound, total in hist['buckets']:
+                labels = _format_labels(endpoint=name, method=method, phase=phase, le=_format_value(bound))
+                lines.append('{0}_request_duration_seconds_bucket{1} {2}'.format(prefix, labels, total))
+
+            labels = _format_labels(endpoint=name, method=method, phase=phase)
+            lines.append('{0}_request_duration_seconds_sum{1} {2}'.format(prefix, labels, _format_value(hist['sum'])))
+            lines.append('{0}_request_duration_seconds_count{1} {2}'.format(prefix, labels, hist['count']))
+
+    return '\n'.join(lines) + '\n'
+
+
+class FileBackend(object):
+    """
+    Shares metrics between the worker processes of a host.  Each worker
+    periodically writes its snapshot to its own file in a common directory,
+    and reading the backend merges the files of every worker so that one
+    scrape covers the whole host.  The requests in flight are only counted for
+    workers that are still running, while the counters of stopped workers are
+    kept so the totals never go backwards.
+    """
+    def __init__(self, directory, interval=1.0):
+        self.__lock = threading.Lock()
+        self.__timer = None
+
+        self.directory = directory
+        self.interval = interval
+
+        try:
+            os.makedirs(directory)
+        except OSError as err:
+            if err.errno != errno.EEXIST:
+                raise
+
+    def path(self, pid=None):
+        return os.path.join(self.directory, 'metrics-{0}.json'.format(pid or os.getpid()))
+
+    def schedule(self, collect):
+        """
+        Schedules the snapshot returned by `collect` to be written within the
+        flush interval, so that writes stay out of the request path.
+
+        :param collect: <callable>
+        """
+        if self.__timer is not None and self.__timer.is_alive():
+            return
+
+        with self.__lock:
+            if self.__timer is None or not self.__timer.is_alive():
+                self.__timer = threading.Timer(self.interval, lambda: self.write(collect()))
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def write(self, snapshot):
+        """
+        Writes the snapshot for the current worker.
+
+        :param snapshot: <dict>
+        """
+        path = self.path()
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.rename(temp_path, path)
+
+    def read(self):
+        """
+        Returns the last written snapshots of every worker.
+
+        :return: [<dict>, ..]
+        """
+        snapshots = []
+        for filename in os.listdir(self.directory):
+            if not (filename.startswith('metrics-') and filename.endswith('.json')):
+                continue
+
+            try:
+                with open(os.path.join(self.directory, filename)) as f:
+                    snapshot = json.load(f)
+            except (IOError, ValueError):
+                continue
+
+            if not _is_running(int(filename[len('metrics-'):-len('.json')])):
+                for methods in snapshot.values():
+                    for data in methods.values():
+                        data['in_flight'] = 0
+
+            snapshots.append(snapshot)
+        return snapshots
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError as err:
+        return err.errno == errno.EPERM
+    else:
+        return True
+
+
+class Metrics(object):
+    """
+    Registry of the per-endpoint metrics collected by an API.  When a backend
+    is given, the metrics are shared with the other workers through it.
+    """
+    def __init__(self, backend=None):
+        self.__lock = threading.Lock()
+        self.__endpoints = {}
+
+        self.backend = backend
+
+    def get(self, name, method):
+        """
+        Returns the metrics for the given endpoint name and method, creating
+        them if needed.
+
+        :param name: <str>
+        :param method: <str>
+
+        :return: <EndpointMetrics>
+        """
+        key = (name, method.lower())
+        try:
+            return self.__endpoints[key]
+        except KeyError:
+            with self.__lock:
+                return self.__endpoints.setdefault(key, EndpointMetrics())
+
+    def start(self, request):
+        """
+        Starts timing the given request.
+
+        :param request: <pyramid.request.Request>
+        """
+        request.restful_timings = RequestTimings()
+
+    def enter(self, request):
+        """
+        Marks the endpoint of the given request as being processed.  Its
+        timings are recorded once the response has been rendered.
+
+        :param request: <pyramid.request.Request>
+        """
+        timings = request.restful_timings
+        timings.mark('traversal')
+        timings.endpoint = self.get(endpoint_name(request), request.method)
+        timings.endpoint.enter()
+        request.add_response_callback(self.record_response)
+
+    def record_response(self, request, response):
+        """
+        Response callback that records the timings of a processed request
+        against its endpoint.
+
+        :param request: <pyramid.request.Request>
+        :param response: <pyramid.response.Response>
+        """
+        timings = request.restful_timings
+        timings.finish()
+        timings.endpoint.record(timings, error=getattr(request, 'exception', None))
+
+        if self.backend is not None:
+            self.backend.schedule(self.snapshot)
+
+    def reset(self):
+        """
+        Clears all the collected metrics.
+        """
+        with self.__lock:
+            self.__endpoints.clear()
+
+    def snapshot(self):
+        """
+        Returns the collected metrics, grouped by endpoint name and method.
+
+        :return: {<str> name: {<str> method: <dict>, ..}, ..}
+        """
+        output = {}
+        for (name, method), metrics in self.__endpoints.items():
+            output.setdefault(name, {})[method] = metrics.snapshot()
+        return output
+
+    def collect(self):
+        """
+        Returns the metrics of every worker sharing the backend, or of this
+        worker when there is no backend.
+
+        :return: <dict>
+        """
+        if self.backend is None:
+            return self.snapshot()
+        else:
+            self.backend.write(self.snapshot())
+            return merge(self.backend.read())
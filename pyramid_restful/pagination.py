@@ -0,0 +1,190 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import itertools
+import json
+import urllib
+
+from collections import Iterator
+from pyramid.httpexceptions import HTTPBadRequest
+
+from .renderer import ADAPTERS
+
+
+def encode_key(obj):
+    """
+    Serializes the key types that JSON does not support, such as dates and
+    decimals, the same way the json2 renderer does.
+
+    :param obj: <variant>
+
+    :return: <variant>
+    """
+    for cls, adapter in ADAPTERS:
+        if isinstance(obj, cls):
+            return adapter(obj, None)
+    raise TypeError('{0!r} is not a valid cursor key'.format(obj))
+
+
+def default_key(item):
+    """
+    Returns the keyset value of an item, which by default is its `id`.
+
+    :param item: <dict> || <object>
+
+    :return: <variant>
+    """
+    if isinstance(item, dict):
+        return item['id']
+    else:
+        return item.id
+
+
+class Page(object):
+    """
+    Describes the page of results requested from a paginated endpoint.  The
+    endpoint returns up to `fetch_size` items ordered by their key, starting
+    after the `after` key when it is set, for example:
+
+        rows = query.filter(Record.id > page.after).order_by(Record.id).limit(page.fetch_size)
+
+    One extra item is fetched so the paginator can tell whether another page
+    follows without counting the results.
+    """
+    __slots__ = ('after', 'size')
+
+    def __init__(self, after=None, size=50):
+        self.after = after
+        self.size = size
+
+    @property
+    def fetch_size(self):
+        return self.size + 1
+
+
+class Paginator(object):
+    """
+    Keyset pagination for list endpoints.  The position in the results is
+    passed between requests as an opaque cursor holding the key of the last
+    item returned, signed so that clients cannot forge it.  Each page is
+    fetched by its key rather than an offset, so later pages cost the same
+    as the first.
+    """
+    def __init__(self, key=None, default_size=50, max_size=200, secret=None):
+        self.key = key or default_key
+        self.default_size = default_size
+        self.max_size = max_size
+        self.secret = secret
+
+    def encode(self, value, secret):
+        """
+        Creates the signed cursor for the given key value.  Dates, times and
+        decimals are stored as strings, and are returned to the endpoint as
+        strings in `page.after`.
+
+        :param value: <variant> JSON serializable key
+        :param secret: <str>
+
+        :return: <str>
+        """
+        data = base64.urlsafe_b64encode(json.dumps(value, separators=(',', ':'), default=encode_key)).rstrip('=')
+        return data + '.' + self.sign(data, secret)
+
+    def decode(self, cursor, secret):
+        """
+        Returns the key value stored in a cursor, raising an HTTPBadRequest
+        error when the cursor is invalid or has been tampered with.
+
+        :param cursor: <str>
+        :param secret: <str>
+
+        :return: <variant>
+        """
+        try:
+            data, _, signature = cursor.encode('ascii').partition('.')
+        except UnicodeError:
+            raise HTTPBadRequest('Invalid cursor')
+
+        if not hmac.compare_digest(self.sign(data, secret), signature):
+            raise HTTPBadRequest('Invalid cursor')
+
+        try:
+            return json.loads(base64.urlsafe_b64decode(data + '=' * (-len(data) % 4)))
+        except (TypeError, ValueError, binascii.Error):
+            raise HTTPBadRequest('Invalid cursor')
+
+    def page(self, request, secret):
+        """
+        Returns the page requested by the `cursor` and `limit` parameters,
+        where the limit is capped at the maximum page size.
+
+        :param request: <pyramid.request.Request>
+        :param secret: <str>
+
+        :return: <Page>
+        """
+        try:
+            size = int(request.params.get('limit', self.default_size))
+        except ValueError:
+            raise HTTPBadRequest('Invalid limit')
+
+        cursor = request.params.get('cursor')
+        after = self.decode(cursor, secret) if cursor else None
+        return Page(after=after, size=max(min(size, self.max_size), 1))
+
+    def paginate(self, request, page, result, secret):
+        """
+        Trims the endpoint's results to the page size and, when another page
+        follows, sets the `Link` and `X-Next-Cursor` headers of the response.
+
+        :param request: <pyramid.request.Request>
+        :param page: <Page>
+        :param result: <iterable>
+        :param secret: <str>
+
+        :return: <list> || <iterator>
+        """
+        items = list(itertools.islice(result, page.fetch_size))
+        has_next = len(items) > page.size
+        items = items[:page.size]
+
+        if has_next:
+            cursor = self.encode(self.key(items[-1]), secret)
+            query = [(k.encode('utf-8'), v.encode('utf-8')) for k, v in request.GET.items() if k != 'cursor']
+            query.append(('cursor', cursor))
+
+            url = '{0}?{1}'.format(request.path_url, urllib.urlencode(query))
+            request.response.headers['Link'] = '<{0}>; rel="next"'.format(url)
+            request.response.headers['X-Next-Cursor'] = cursor
+
+        # keep streaming results streamed to the renderer
+        if isinstance(result, Iterator):
+            return iter(items)
+        else:
+            return items
+
+    def sign(self, data, secret):
+        return hmac.new(str(self.secret or secret), data, hashlib.sha1).hexdigest()[:20]
+
+    @classmethod
+    def create(cls, options):
+        """
+        Creates a new paginator from the `paginate=` option of an endpoint,
+        which can be a paginator instance, a key function or a dictionary of
+        keyword arguments for this class.
+
+        :param options: <Paginator> || <callable> || <dict> || None
+
+        :return: <Paginator> || None
+        """
+        if options is None or options is False:
+            return None
+        elif isinstance(options, Paginator):
+            return options
+        elif options is True:
+            return cls()
+        elif isinstance(options, dict):
+            return cls(**options)
+        else:
+            return cls(key=options)
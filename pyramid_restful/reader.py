@@ -0,0 +1,215 @@
+import json
+import re
+
+from pyramid.httpexceptions import HTTPBadRequest, HTTPRequestEntityTooLarge
+
+# the characters other than brackets and quotes, used to check the depth of
+# a body without parsing it
+NON_STRUCTURE = ''.join(chr(i) for i in xrange(256) if chr(i) not in '[]{}"')
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JSONBodyReader(object):
+    """
+    Reads the JSON body of a request incrementally from its body file.  The
+    size of the body is checked while it is read, so an oversized upload is
+    rejected before it has been read into memory, and its nesting depth is
+    checked before it is parsed.  The items of a top-level array can also be
+    parsed and handled one at a time.
+
+    Endpoints opt in by reading their body through `request.json_reader`
+    rather than `request.json_body`:
+
+        @endpoint.post()
+        def import_records(request):
+            for record in request.json_reader.items():
+                save(record)
+    """
+    def __init__(self, request, max_size=10485760, max_depth=64, chunk_size=65536):
+        self.request = request
+        self.max_size = max_size
+        self.max_depth = max_depth
+        self.chunk_size = chunk_size
+
+    def chunks(self):
+        """
+        Yields the body of the request in chunks, raising HTTPRequestEntityTooLarge
+        as soon as it is known to be larger than the maximum size.
+
+        :return: <generator>
+        """
+        if self.request.content_length is not None and self.request.content_length > self.max_size:
+            raise HTTPRequestEntityTooLarge('Request body is limited to {0} bytes'.format(self.max_size))
+
+        body_file = self.request.body_file
+        size = 0
+        while True:
+            chunk = body_file.read(self.chunk_size)
+            if not chunk:
+                break
+
+            size += len(chunk)
+            if size > self.max_size:
+                raise HTTPRequestEntityTooLarge('Request body is limited to {0} bytes'.format(self.max_size))
+            yield chunk
+
+    def items(self):
+        """
+        Yields the items of a top-level JSON array as they are read.
+
+        :return: <generator>
+        """
+        decoder = json.JSONDecoder()
+        buf = _Buffer(self.chunks())
+
+        if buf.peek() != '[':
+            raise HTTPBadRequest('JSON body must be an array')
+        buf.pos += 1
+
+        if buf.peek() == ']':
+            buf.pos += 1
+        else:
+            while True:
+                yield self.__decode_item(buf, decoder)
+
+                token = buf.peek()
+                buf.pos += 1
+                if token == ']':
+                    break
+                elif token != ',':
+                    raise HTTPBadRequest('Invalid JSON body')
+
+        if buf.peek():
+            raise HTTPBadRequest('Invalid JSON body')
+
+    def load(self):
+        """
+        Reads and parses the whole JSON body within the size and depth limits.
+
+        :return: <variant>
+        """
+        body = ''.join(self.chunks())
+        self.check_depth(body)
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise HTTPBadRequest('Invalid JSON body')
+
+    def check_depth(self, body, max_depth=None):
+        """
+        Raises an HTTPBadRequest error when the nesting depth of the body is
+        over the maximum depth.  The brackets of the body are checked without
+        parsing it, removing one level of empty pairs per pass.
+
+        :param body: <str>
+        :param max_depth: <int> || None
+        """
+        if max_depth is None:
+            max_depth = self.max_depth
+
+        # a body is never nested deeper than its number of opening brackets
+        if body.count('[') + body.count('{') <= max_depth:
+            return
+
+        # once escaped backslashes and then escaped quotes are removed, every
+        # other quote closes a string, each step being a single linear pass
+        body = body.replace('\\\\', '').replace('\\"', '')
+        brackets = ''.join(body.translate(None, NON_STRUCTURE).split('"')[::2])
+
+        depth = 0
+        while brackets:
+            # pairs are marked first so that emptying one level never lets
+            # the pairs around it match in the same pass
+            stripped = brackets.replace('[]', '.').replace('{}', '.').replace('.', '')
+
+            # unbalanced brackets are left for the parser to reject
+            if len(stripped) == len(brackets):
+                break
+
+            depth += 1
+            if depth > max_depth:
+                raise HTTPBadRequest('JSON body is limited to a depth of {0}'.format(self.max_depth))
+            brackets = stripped
+
+    def __decode_item(self, buf, decoder):
+        if buf.peek() in (']', ''):
+            raise HTTPBadRequest('Invalid JSON body')
+
+        # an item is only complete once the separator after it has been read,
+        # as a number at the end of the buffer may continue in the next chunk.
+        # An incomplete item is parsed again once the buffer has doubled, so a
+        # large item is not parsed again for every chunk.
+        attempted = 0
+        while True:
+            size = len(buf.data) - buf.pos
+            if buf.exhausted or size >= 2 * attempted:
+                attempted = size
+                try:
+                    item, end = decoder.raw_decode(buf.data, buf.pos)
+                except ValueError:
+                    if buf.exhausted:
+                        raise HTTPBadRequest('Invalid JSON body')
+                except RuntimeError:
+                    raise HTTPBadRequest('JSON body is limited to a depth of {0}'.format(self.max_depth))
+                else:
+                    following = WHITESPACE.match(buf.data, end).end()
+                    if buf.exhausted or buf.data[following:following + 1] in (',', ']'):
+                        self.check_depth(buf.data[buf.pos:end], self.max_depth - 1)
+                        buf.pos = end
+                        return item
+
+            buf.fill()
+
+    @classmethod
+    def factory(cls, max_size=10485760, max_depth=64, chunk_size=65536):
+        """
+        Returns a request method creating readers with the given limits.
+
+        :return: <callable>
+        """
+        def create(request):
+            return cls(request, max_size=max_size, max_depth=max_depth, chunk_size=chunk_size)
+        return create
+
+
+class _Buffer(object):
+    """
+    Part of a body being read, from the item being parsed to the end of the
+    last chunk read.
+    """
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.data = ''
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self):
+        """
+        Reads the next chunk of the body, dropping the part already parsed.
+
+        :return: <bool> False at the end of the body
+        """
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.exhausted = True
+            return False
+
+        self.data = self.data[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace, returning the next character of the body or an
+        empty string at its end.
+
+        :return: <str>
+        """
+        while True:
+            self.pos = WHITESPACE.match(self.data, self.pos).end()
+            if self.pos < len(self.data):
+                return self.data[self.pos]
+            elif not self.fill():
+                return ''
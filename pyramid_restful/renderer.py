@@ -1,11 +1,345 @@
-# need to import this module to register the proper serializers
-import projex.rest
+import datetime
+import decimal
+import hashlib
+import importlib
+import itertools
+import zlib
+
+from collections import Iterator
+
 from pyramid.renderers import JSON
 
+# JSON encoders that can be selected with the `restful.json.backend` setting,
+# mapped to the keyword arguments they are called with.  simplejson writes
+# decimals as bare numbers by default, which would skip the Decimal adapter
+# and render them differently than the other backends.
+BACKENDS = {
+    'json': {'separators': (',', ':')},
+    'simplejson': {'separators': (',', ':'), 'use_decimal': False},
+    'rapidjson': {},
+}
+
+# types that projex.rest knows how to serialize that the standard
+# encoders do not
+ADAPTERS = (
+    (datetime.datetime, lambda obj, request: obj.isoformat()),
+    (datetime.date, lambda obj, request: obj.isoformat()),
+    (datetime.time, lambda obj, request: obj.isoformat()),
+    (decimal.Decimal, lambda obj, request: str(obj)),
+    (set, lambda obj, request: list(obj)),
+    (frozenset, lambda obj, request: list(obj)),
+)
+
+
+_PROJEX_REST = None
+
+
+def projex_rest():
+    """
+    Returns the projex.rest module, which along with the serializers it
+    registers is only imported the first time a value is rendered.  The
+    module is kept so later renders skip the import machinery and its lock.
+
+    :return: <module>
+    """
+    global _PROJEX_REST
+    if _PROJEX_REST is None:
+        import projex.rest
+        _PROJEX_REST = projex.rest
+    return _PROJEX_REST
+
+
+def jsonify(value, **kw):
+    """
+    Serializes the value with `projex.rest.jsonify`.
+
+    :param value: <variant>
+
+    :return: <str>
+    """
+    return projex_rest().jsonify(value, **kw)
+
+
+class BackendSerializer(object):
+    """
+    Wraps a fast JSON `dumps` function so it can be used as the serializer
+    for the `JSON2` renderer.  Objects the encoder cannot handle are passed
+    through the renderer's adapters and then the projex.rest encoders, and
+    if encoding still fails, the whole value is serialized with
+    `projex.rest.jsonify` instead.
+    """
+    def __init__(self, dumps, **kw):
+        self.dumps = dumps
+        self.kw = kw
+
+    def __call__(self, value, default=None, **kw):
+        def encode(obj):
+            if default is not None:
+                try:
+                    return default(obj)
+                except TypeError:
+                    pass
+
+            return projex_rest().py2json(obj)
+
+        options = dict(self.kw)
+        options.update(kw)
+
+        try:
+            return self.dumps(value, default=encode, **options)
+        except (TypeError, ValueError, OverflowError):
+            return jsonify(value)
+
+
+def load_backend(backend):
+    """
+    Returns the serializer for the given backend name.  The name can either
+    be one of the keys in the `BACKENDS` map, `jsonify` for the default
+    projex.rest serializer, or a dotted path to a `dumps` compatible function
+    (such as `mypackage.encoding:dumps`).
+
+    :param backend: <str> || <callable>
+
+    :return: <callable>
+    """
+    if callable(backend):
+        return BackendSerializer(backend)
+    elif not backend or backend == 'jsonify':
+        return jsonify
+    elif backend in BACKENDS:
+        module = importlib.import_module(backend)
+        return BackendSerializer(module.dumps, **BACKENDS[backend])
+    else:
+        module_name, _, attr = backend.replace(':', '.').rpartition('.')
+        if not module_name:
+            raise ValueError('Invalid JSON backend: {0}'.format(backend))
+        module = importlib.import_module(module_name)
+        return BackendSerializer(getattr(module, attr))
+
 
 class JSON2(JSON):
-    def __init__(self, serializer=projex.rest.jsonify, adapters=(), **kw):
-        serializer = projex.rest.jsonify
+    def __init__(self,
+                 serializer=None,
+                 adapters=(),
+                 backend=None,
+                 chunk_size=100,
+                 etag=False,
+                 compression=False,
+                 compression_min_size=1024,
+                 compression_level=6,
+                 **kw):
+        if serializer is None:
+            serializer = load_backend(backend)
+
+        # register the projex types as adapters for the other backends
+        if serializer is not jsonify:
+            adapters = ADAPTERS + tuple(adapters)
+
         super(JSON2, self).__init__(serializer=serializer, adapters=adapters, **kw)
 
-json2_renderer_factory = JSON2()
\ No newline at end of file
+        self.chunk_size = chunk_size
+        self.etag = etag
+        self.compression = compression
+        self.compression_min_size = compression_min_size
+        self.compression_level = compression_level
+
+    def __call__(self, info):
+        render = super(JSON2, self).__call__(info)
+
+        def _render(value, system):
+            request = system.get('request')
+
+            # reduce the result to the fields requested by the client
+            fields = getattr(request, 'fields', None)
+            if fields is not None and getattr(request, 'exception', None) is None:
+                value = fields.prune(value)
+
+            if not isinstance(value, Iterator):
+                if self.etag and request is not None and request.method == 'GET':
+                    body = self.render_etag(render, value, system)
+                else:
+                    body = render(value, system)
+
+                if self.compression and request is not None:
+                    return self.compress(request, body)
+                else:
+                    return body
+
+            if request is not None:
+                response = request.response
+                if response.content_type == response.default_content_type:
+                    response.content_type = 'application/json'
+
+            # pull the first item now so errors raised before any content
+            # is generated are still handled by the error views
+            try:
+                first = next(value)
+            except StopIteration:
+                items = iter(())
+            else:
+                items = itertools.chain((first,), value)
+
+            chunks = self.stream(items, self._make_default(request))
+            if self.compression and request is not None:
+                return self.compress_stream(request, chunks)
+            else:
+                return chunks
+
+        return _render
+
+    def compress(self, request, body):
+        """
+        Compresses the rendered body with the best encoding the client
+        accepts, leaving bodies under `compression_min_size` bytes as is.
+
+        :param request: <pyramid.request.Request>
+        :param body: <str> || <unicode>
+
+        :return: <str> || <unicode>
+        """
+        if len(body) < self.compression_min_size:
+            add_vary(request.response, 'Accept-Encoding')
+            return body
+
+        compressor = self.compressor(request)
+        if compressor is None:
+            return body
+
+        if isinstance(body, unicode):
+            body = body.encode(request.response.charset or 'utf-8')
+        return compressor.compress(body) + compressor.flush()
+
+    def compress_stream(self, request, chunks):
+        """
+        Compresses a streamed body chunk by chunk.  The size of a stream is
+        not known ahead of time, so it is always compressed when the client
+        supports it.
+
+        :param request: <pyramid.request.Request>
+        :param chunks: <generator>
+
+        :return: <generator>
+        """
+        compressor = self.compressor(request)
+        if compressor is None:
+            return chunks
+
+        def compressed():
+            for chunk in chunks:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+
+        return compressed()
+
+    def compressor(self, request):
+        """
+        Negotiates the content encoding for the response from the request's
+        `Accept-Encoding` header, returning a new zlib compressor for it or
+        None if the response should not be compressed.
+
+        :param request: <pyramid.request.Request>
+
+        :return: <zlib.Compress> || None
+        """
+        response = request.response
+        add_vary(response, 'Accept-Encoding')
+
+        if response.content_encoding or response.status_int == 304:
+            return None
+
+        # webob treats a missing header as accepting any encoding, but only
+        # clients that ask for compression should receive it
+        if 'Accept-Encoding' not in request.headers:
+            return None
+
+        encoding = request.accept_encoding.best_match(('gzip', 'deflate'))
+        if encoding == 'gzip':
+            compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            compressor = zlib.compressobj(self.compression_level)
+        else:
+            return None
+
+        response.content_encoding = encoding
+
+        # the compressed body is only semantically equivalent to the tagged one
+        etag = response.etag
+        if etag is not None:
+            response.etag = (etag, False)
+
+        return compressor
+
+    def render_etag(self, render, value, system):
+        """
+        Renders the value for a GET request, tagging the response with a
+        strong ETag made from the body (unless the endpoint already supplied
+        one) and replacing it with an empty 304 when the client's copy is
+        still current.  Only successful responses are tagged, so an error
+        can never be mistaken for a cached copy of the resource.
+
+        :param render: <callable>
+        :param value: <variant>
+        :param system: <dict>
+
+        :return: <str>
+        """
+        request = system['request']
+        response = request.response
+        if not 200 <= response.status_int < 300:
+            return render(value, system)
+
+        body = None
+        if response.etag is None:
+            body = render(value, system)
+            data = body.encode('utf-8') if isinstance(body, unicode) else body
+            response.etag = hashlib.sha1(data).hexdigest()
+
+        if response.status_int == 200 and response.etag in request.if_none_match:
+            response.status = 304
+            return ''
+        elif body is None:
+            return render(value, system)
+        else:
+            return body
+
+    def stream(self, items, default):
+        """
+        Serializes the given items as a JSON array, yielding the content in
+        chunks of `chunk_size` items so the whole array never needs to be
+        held in memory.
+
+        :param items: <iter>
+        :param default: <callable>
+
+        :return: <generator>
+        """
+        chunk = []
+        separator = '['
+        for item in items:
+            chunk.append(separator)
+            chunk.append(self.serializer(item, default=default, **self.kw))
+            separator = ','
+
+            if len(chunk) >= 2 * self.chunk_size:
+                yield encode_chunk(chunk)
+                chunk = []
+
+        if separator == '[':
+            chunk.append(separator)
+        chunk.append(']')
+        yield encode_chunk(chunk)
+
+
+def add_vary(response, header):
+    vary = tuple(response.vary or ())
+    if header not in vary:
+        response.vary = vary + (header,)
+
+
+def encode_chunk(chunk):
+    output = ''.join(chunk)
+    if isinstance(output, unicode):
+        output = output.encode('utf-8')
+    return output
+
+json2_renderer_factory = JSON2()
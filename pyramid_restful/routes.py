@@ -0,0 +1,127 @@
+import re
+
+from pyramid.urldispatch import Route
+
+# matches a segment that is made up entirely of a single {placeholder}
+SIMPLE_PLACEHOLDER = re.compile(r'^\{([_a-zA-Z]\w*)\}$')
+
+# characters that mark a segment as something other than static text
+SPECIAL_CHARS = re.compile(r'[{}*:]')
+
+
+class RouteNode(object):
+    __slots__ = ('static', 'placeholder', 'leaf')
+
+    def __init__(self):
+        self.static = {}
+        self.placeholder = None
+        self.leaf = None
+
+
+class RouteTrie(object):
+    """
+    Compiles endpoint patterns into a segment trie so that a path can be
+    matched in time proportional to its depth rather than the number of
+    registered routes.
+
+    Static segments are looked up first, then `{placeholder}` segments.
+    Patterns that cannot be expressed as plain segments (custom regular
+    expressions, `*remainder` stars, partial placeholders) fall back to
+    the standard `pyramid.urldispatch.Route` matching.  When more than one
+    pattern matches a path, the one that was registered first wins, just
+    as it would when scanning the routes in order.
+    """
+    def __init__(self):
+        self.__root = RouteNode()
+        self.__fallback = []
+        self.__count = 0
+
+    def __len__(self):
+        return self.__count
+
+    def add(self, pattern, value):
+        """
+        Compiles the given pattern into the trie.
+
+        :param pattern: <str>
+        :param value: <variant>
+        """
+        index = self.__count
+        self.__count += 1
+
+        if not pattern.startswith('/'):
+            pattern = '/' + pattern
+
+        segments = pattern[1:].split('/')
+        names = []
+        node = self.__root
+
+        for segment in segments:
+            placeholder = SIMPLE_PLACEHOLDER.match(segment)
+            if placeholder:
+                names.append(placeholder.group(1))
+                if node.placeholder is None:
+                    node.placeholder = RouteNode()
+                node = node.placeholder
+
+            elif not segment or SPECIAL_CHARS.search(segment):
+                self.__fallback.append((index, Route('', pattern), value))
+                return
+
+            else:
+                node = node.static.setdefault(segment, RouteNode())
+
+        # the first pattern registered for a path takes priority
+        if node.leaf is None:
+            node.leaf = (index, tuple(names), value)
+
+    def match(self, traverse):
+        """
+        Looks up the value registered for the given traversal path.
+
+        :param traverse: <tuple> of path segments
+
+        :return: (<variant> value, <dict> matchdict) or None
+        """
+        best = self.__search(self.__root, traverse, 0, [])
+
+        if self.__fallback:
+            path = '/' + '/'.join(traverse)
+            for index, route, value in self.__fallback:
+                if best is not None and best[0] < index:
+                    break
+
+                matchdict = route.match(path)
+                if matchdict is not None:
+                    best = (index, value, matchdict)
+                    break
+
+        if best is None:
+            return None
+        else:
+            return best[1], best[2]
+
+    def __search(self, node, traverse, depth, values):
+        if depth == len(traverse):
+            if node.leaf is None:
+                return None
+            else:
+                index, names, value = node.leaf
+                return index, value, dict(zip(names, values))
+
+        segment = traverse[depth]
+        best = None
+
+        child = node.static.get(segment)
+        if child is not None:
+            best = self.__search(child, traverse, depth + 1, values)
+
+        if node.placeholder is not None and segment:
+            values.append(segment)
+            found = self.__search(node.placeholder, traverse, depth + 1, values)
+            values.pop()
+
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+
+        return best
@@ -1,53 +1,233 @@
+import math
+import Queue
+import threading
+
+from functools import partial
+from pyramid.httpexceptions import HTTPServiceUnavailable
+
 from .endpoint import Endpoint
+from .limits import ReleasingIterator
+
+
+class EndpointIndex(dict):
+    """
+    Frozen map of endpoint names to endpoints, built once when a service is
+    registered and shared by every request to it.  It is a dict so lookups
+    stay as fast as a plain one, but it cannot be modified once built.
+    """
+    def __readonly(self, *args, **kw):
+        raise TypeError('Endpoint indexes are read-only.')
+
+    __setitem__ = __delitem__ = __readonly
+    clear = pop = popitem = setdefault = update = __readonly
+
+
+def endpoint_routes(root, index):
+    """
+    Generates the route listing for the endpoints in a service index.
+
+    :param root: <str>
+    :param index: {<str> name: <pyramid_restful.endpoint.Endpoint>, ..}
+
+    :return: {<str> path: <str> methods, ..}
+    """
+    return {
+        '/{0}/{1}'.format(root, name): ','.join(sorted(endpoint.callables.keys()))
+        for name, endpoint in index.items()
+    }
 
 
 class ModuleService(object):
-    def __init__(self, request, module):
+    def __init__(self, request, module, index=None):
         self.request = request
         self.module = module
+        self.index = index if index is not None else self.build_index(module)
 
     def __getitem__(self, key):
+        return self.index[key]
+
+    @classmethod
+    def build_index(cls, module):
+        """
+        Maps the names of the endpoints exposed by the module to their
+        endpoint instance.
+
+        :param module: <module>
+
+        :return: <EndpointIndex>
+        """
+        index = {}
+        for name, value in vars(module).items():
+            endpoint = getattr(value, 'endpoint', None)
+            if isinstance(endpoint, Endpoint):
+                index[name] = endpoint
+        return EndpointIndex(index)
+
+    @classmethod
+    def routes(cls, obj, name=None, index=None):
+        root = name or obj.__name__.split('.')[-1]
+        return endpoint_routes(root, index if index is not None else cls.build_index(obj))
+
+
+class RequestScope(object):
+    """
+    Creates a new instance of the class for every request, passing the
+    request to its constructor.
+    """
+    pass_request = False
+
+    def __init__(self, cls):
+        self.cls = cls
+
+    def acquire(self, request):
+        return self.cls(request)
+
+    def release(self, instance):
+        pass
+
+
+class SingletonScope(RequestScope):
+    """
+    Shares a single instance of the class across the whole process.  The
+    class is constructed without arguments and its endpoints are passed the
+    request on every call.
+    """
+    pass_request = True
+
+    def __init__(self, cls):
+        super(SingletonScope, self).__init__(cls)
+
+        self.__lock = threading.Lock()
+        self.__instance = None
+
+    def acquire(self, request):
+        if self.__instance is None:
+            with self.__lock:
+                if self.__instance is None:
+                    self.__instance = self.cls()
+        return self.__instance
+
+
+class PooledScope(RequestScope):
+    """
+    Hands out instances of the class from a bounded, thread-safe pool.  A
+    request that finds every instance in use waits up to `timeout` seconds
+    for one to be released and is rejected with a 503 response after that.
+    An instance is held until the request has finished and any result it
+    streams has been read.  The class is constructed without arguments and
+    its endpoints are passed the request on every call.
+    """
+    pass_request = True
+
+    def __init__(self, cls, size=10, timeout=30):
+        super(PooledScope, self).__init__(cls)
+
+        self.__lock = threading.Lock()
+        self.__pool = Queue.Queue()
+        self.__created = 0
+        self.__holds = {}
+
+        self.size = size
+        self.timeout = timeout
+
+    def acquire(self, request):
         try:
-            function = getattr(self.module, key)
-        except AttributeError:
-            raise KeyError
-        else:
-            if isinstance(getattr(function, 'endpoint', None), Endpoint):
-                return function.endpoint
+            instance = self.__pool.get_nowait()
+        except Queue.Empty:
+            with self.__lock:
+                create = self.__created < self.size
+                if create:
+                    self.__created += 1
+
+            if create:
+                try:
+                    instance = self.cls()
+                except StandardError:
+                    with self.__lock:
+                        self.__created -= 1
+                    raise
             else:
-                raise KeyError
+                try:
+                    instance = self.__pool.get(timeout=self.timeout)
+                except Queue.Empty:
+                    raise HTTPServiceUnavailable('This resource is busy, please try again later.',
+                                                 headers={'Retry-After': str(max(int(math.ceil(self.timeout)), 1))})
 
-    @classmethod
-    def routes(cls, obj):
-        root = obj.__name__.split('.')[-1]
-        output = {}
-        for value in vars(obj):
-            if isinstance(getattr(value, 'endpoint', None), Endpoint):
-                output['/{0}/{1}'.format(root, value.name)] = ','.join(sorted(value.callables.keys()))
-        return output
+        with self.__lock:
+            self.__holds[id(instance)] = 1
+
+        request.add_response_callback(lambda r, response: self.hold(instance, response))
+        request.add_finished_callback(lambda r: self.release(instance))
+        return instance
+
+    def hold(self, instance, response):
+        """
+        Keeps the instance out of the pool until a streamed response has
+        been read, as the request finishes before its body is sent.
+
+        :param instance: <object>
+        :param response: <pyramid.response.Response>
+        """
+        if isinstance(response.app_iter, (list, tuple)):
+            return
+
+        with self.__lock:
+            self.__holds[id(instance)] += 1
+        response.app_iter = ReleasingIterator(iter(response.app_iter), partial(self.release, instance))
+
+    def release(self, instance):
+        with self.__lock:
+            holds = self.__holds.pop(id(instance), 1) - 1
+            if holds > 0:
+                self.__holds[id(instance)] = holds
+                return
+        self.__pool.put(instance)
+
+
+SCOPES = {
+    'request': RequestScope,
+    'singleton': SingletonScope,
+    'pooled': PooledScope
+}
 
 
 class ClassService(object):
-    def __init__(self, request, cls):
+    def __init__(self, request, cls, index=None):
         self.request = request
-        self.instance = cls(request)
+        self.scope = cls if isinstance(cls, RequestScope) else RequestScope(cls)
+        self.index = index if index is not None else self.build_index(self.scope.cls)
+        self.instance = self.scope.acquire(request)
 
     def __getitem__(self, key):
-        try:
-            method = getattr(self.instance, key)
-        except AttributeError:
-            raise KeyError
+        match = self.index[key].callables[self.request.method.lower()]
+        method = getattr(self.instance, match.__name__)
+
+        # shared instances are given the request per call
+        if self.scope.pass_request:
+            return partial(method, self.request)
         else:
-            if isinstance(getattr(method.im_func, 'endpoint', None), Endpoint):
-                match = method.im_func.endpoint.callables[self.instance.request.method.lower()]
-                return getattr(self.instance, match.__name__)
-            else:
-                raise KeyError
+            return method
+
+    @classmethod
+    def build_index(cls, service_cls):
+        """
+        Maps the names of the endpoint methods exposed by the class to their
+        endpoint instance.
+
+        :param service_cls: <type>
+
+        :return: <EndpointIndex>
+        """
+        index = {}
+        for name in dir(service_cls):
+            function = getattr(getattr(service_cls, name, None), 'im_func', None)
+            endpoint = getattr(function, 'endpoint', None)
+            if isinstance(endpoint, Endpoint):
+                index[name] = endpoint
+        return EndpointIndex(index)
 
     @classmethod
-    def routes(cls, obj):
-        output = {}
-        for value in vars(obj):
-            if isinstance(getattr(value.im_func, 'endpoint', None), Endpoint):
-                output['/{0}/{1}'.format(root, value.name)] = ','.join(sorted(value.callables.keys()))
-        return output
\ No newline at end of file
+    def routes(cls, obj, name=None, index=None):
+        service_cls = getattr(obj, 'cls', obj)
+        root = name or service_cls.__name__
+        return endpoint_routes(root, index if index is not None else cls.build_index(service_cls))
@@ -1,6 +1,84 @@
+from collections import Mapping
 from pyramid.httpexceptions import HTTPBadRequest
 
 
+class Payload(Mapping):
+    """
+    Read-only view of the request's payload information, merging the URL
+    parameter information with the JSON body of the request, where values
+    from the JSON body override the URL parameters.
+
+    Each source is only read the first time it is needed and is kept for the
+    rest of the request, so the JSON body is parsed at most once no matter
+    how many helpers look at the payload.  It is available for every request
+    as `request.payload`.
+
+    This class assumes that the JSON body being provided
+    is also a key-value map, if it is not, then an HTTPBadRequest
+    exception will be raised when it is read.
+    """
+    def __init__(self, request):
+        self.__request = request
+        self.__params = None
+        self.__json = None
+
+    def __getitem__(self, key):
+        json_data = self.json()
+        try:
+            return json_data[key]
+        except KeyError:
+            return self.params()[key]
+
+    def __contains__(self, key):
+        return key in self.json() or key in self.params()
+
+    def __iter__(self):
+        json_data = self.json()
+        for key in json_data:
+            yield key
+        for key in self.params():
+            if key not in json_data:
+                yield key
+
+    def __len__(self):
+        json_data = self.json()
+        return len(json_data) + sum(1 for key in self.params() if key not in json_data)
+
+    def __repr__(self):
+        return '<Payload {0!r}>'.format(dict(self))
+
+    def json(self):
+        """
+        Returns the JSON body of the request, parsing it on first use.
+
+        :return: <dict>
+        """
+        if self.__json is None:
+            try:
+                json_data = self.__request.json_body
+
+            # no JSON body was found, pyramid raises an error
+            # in this situation
+            except StandardError:
+                json_data = {}
+
+            if not isinstance(json_data, dict):
+                raise HTTPBadRequest('JSON body must be a key=value pairing')
+
+            self.__json = json_data
+        return self.__json
+
+    def params(self):
+        """
+        Returns the URL parameters of the request.
+
+        :return: <dict>
+        """
+        if self.__params is None:
+            self.__params = self.__request.params.mixed()
+        return self.__params
+
+
 def get_payload(request):
     """
     Extracts the request's payload information.
@@ -8,30 +86,15 @@ def get_payload(request):
     and the JSON body of the request together to generate
     a dictionary of key<->value pairings.
 
-    This method assumes that the JSON body being provided
-    is also a key-value map, if it is not, then an HTTPBadRequest
-    exception will be raised.
+    This returns a new dictionary which is safe to modify, use the
+    `request.payload` view when only reading from it.
 
     :param request: <pyramid.request.Request>
 
     :return: <dict>
     """
-    # always extract values from the URL
-    payload = dict(request.params.mixed())
-
-    # provide override capability from the JSON body
     try:
-        json_data = request.json_body
-
-    # no JSON body was found, pyramid raises an error
-    # in this situation
-    except StandardError:
-        pass
-
-    else:
-        if not isinstance(json_data, dict):
-            raise HTTPBadRequest('JSON body must be a key=value pairing')
-        else:
-            payload.update(json_data)
-
-    return payload
\ No newline at end of file
+        payload = request.payload
+    except AttributeError:
+        payload = Payload(request)
+    return dict(payload)
@@ -0,0 +1,32 @@
+from pyramid import security
+from pyramid_restful import endpoint
+
+
+@endpoint.get(pattern='/catalog/items/{id}')
+def item(request):
+    return {'id': request.matchdict['id']}
+
+
+@endpoint.get(permission=security.Authenticated)
+def secure(request):
+    return {}
+
+
+@endpoint.get()
+def catalog_version(request):
+    return 1
+
+
+class products(object):
+    def __init__(self, request):
+        self.request = request
+
+    @endpoint.get()
+    def featured(self):
+        return ['a']
+
+
+class stock(object):
+    @endpoint.get()
+    def count(self, request):
+        return 10
@@ -13,3 +13,24 @@ def test_get_bad_url(pyramid_app):
 def test_get_docs(basics, modules, classes, pyramid_app):
     r = pyramid_app.get('/api/v1', headers={'Accept': 'text/html'})
     assert r.html is not None
+
+def test_get_docs_cached_until_register(basics, pyramid_app):
+    import types
+
+    api = basics
+    r = pyramid_app.get('/api/v1', headers={'Accept': 'text/html'})
+    assert r.body == pyramid_app.get('/api/v1', headers={'Accept': 'text/html'}).body
+    assert 'href="#docs_cache"' not in r.body
+
+    api.register(types.ModuleType('docs_cache'))
+    r = pyramid_app.get('/api/v1', headers={'Accept': 'text/html'})
+    assert 'href="#docs_cache"' in r.body
+
+def test_get_docs_cache_bounded(basics, pyramid_app):
+    documentation = basics._ApiFactory__documentation
+    for i in range(40):
+        host = 'host{0}.example.com'.format(i)
+        r = pyramid_app.get('/api/v1', headers={'Accept': 'text/html', 'Host': host})
+        assert 'http://{0}/api/v1'.format(host) in r.body
+
+    assert len(documentation._Documentation__cache) == 16
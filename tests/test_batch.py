@@ -0,0 +1,121 @@
+import json
+import pytest
+
+
+def make_batch_app(**options):
+    from pyramid.config import Configurator
+    from pyramid.testing import DummySecurityPolicy
+    from pyramid import security
+    from pyramid_restful import endpoint
+    from webtest import TestApp
+
+    settings = {
+        'restful.api.root': '/api/v1',
+        'restful.batch.path': 'batch',
+        'restful.batch.workers': '2',
+        'restful.batch.max_items': '5',
+    }
+    settings.update(options)
+
+    config = Configurator(settings=settings)
+    config.include('pyramid_restful')
+
+    class Policy(DummySecurityPolicy):
+        def permits(self, context, principals, permission):
+            return permission in principals
+
+    policy = Policy()
+    config.set_authentication_policy(policy)
+    config.set_authorization_policy(policy)
+
+    items = []
+
+    @endpoint.get()
+    def items_list(request):
+        return list(items)
+
+    @items_list.endpoint.post()
+    def add_item(request):
+        items.append(request.json_body['name'])
+        return len(items)
+
+    @endpoint.get(pattern='/items/{index}')
+    def item(request):
+        return items[int(request.matchdict['index'])]
+
+    @endpoint.get(permission=security.Authenticated)
+    def secret(request):
+        return 'secret'
+
+    @endpoint.get()
+    def echo(request):
+        return request.GET.dict_of_lists()
+
+    @endpoint.get()
+    def big(request):
+        return [{'id': i} for i in xrange(100)]
+
+    config.registry.rest_api.register([items_list, item, secret, echo, big])
+    return TestApp(config.make_wsgi_app())
+
+
+@pytest.fixture()
+def batch_app():
+    return make_batch_app()
+
+
+def test_batch_requests(batch_app):
+    r = batch_app.post_json('/api/v1/batch', [
+        {'method': 'POST', 'path': '/items_list', 'body': {'name': 'a'}},
+        {'method': 'POST', 'path': '/api/v1/items_list', 'body': {'name': 'b'}},
+        {'path': '/items_list'},
+        {'path': '/items/1'},
+        {'path': '/secret'},
+    ])
+
+    assert r.json == [
+        {'status': 200, 'body': 1},
+        {'status': 200, 'body': 2},
+        {'status': 200, 'body': ['a', 'b']},
+        {'status': 200, 'body': 'b'},
+        {'status': 403, 'body': {'type': 'httpforbidden', 'error': 'Access was denied to this resource.'}},
+    ]
+
+
+def test_batch_params(batch_app):
+    r = batch_app.post_json('/api/v1/batch', [
+        {'path': '/echo', 'params': {u'name': u'caf\xe9', u'tags': [u'a', u'\xfc']}},
+        {'path': '/echo?page=2', 'params': [[u'q', u'\u2603']]},
+    ])
+    assert r.json == [
+        {'status': 200, 'body': {u'name': [u'caf\xe9'], u'tags': [u'a', u'\xfc']}},
+        {'status': 200, 'body': {u'page': [u'2'], u'q': [u'\u2603']}},
+    ]
+
+
+def test_batch_invalid_items(batch_app):
+    r = batch_app.post_json('/api/v1/batch', [{'path': '/missing'}, {'path': '/batch'}, {}])
+    assert [result['status'] for result in r.json] == [404, 400, 400]
+
+    r = batch_app.post_json('/api/v1/batch', [{'path': '/items_list'}] * 6, expect_errors=True)
+    assert r.status_code == 400
+
+    r = batch_app.post_json('/api/v1/batch', {'path': '/items_list'}, expect_errors=True)
+    assert r.status_code == 400
+
+
+def test_batch_compressed_results():
+    import zlib
+    from webob import Request
+
+    # webtest drops the Accept-Encoding header, so the app is called directly
+    app = make_batch_app(**{'restful.json.compression': 'true', 'restful.json.compression.min_size': '100'})
+    request = Request.blank('/api/v1/batch', method='POST', headers={'Accept-Encoding': 'gzip'})
+    request.content_type = 'application/json'
+    request.body = json.dumps([{'path': '/big'}])
+
+    response = request.get_response(app.app)
+    assert response.content_encoding == 'gzip'
+    assert json.loads(zlib.decompress(response.body, 16 + zlib.MAX_WBITS)) == [
+        {'status': 200, 'body': [{'id': i} for i in xrange(100)]}
+    ]
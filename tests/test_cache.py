@@ -0,0 +1,91 @@
+import pytest
+
+
+def test_cache_lru_eviction():
+    from pyramid_restful.cache import ResponseCache
+
+    cache = ResponseCache(max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+
+    cache.set('c', 3)
+    assert len(cache) == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+    assert cache.get('c') == 3
+
+
+def test_cache_ttl_expiry(monkeypatch):
+    import time
+    from pyramid_restful.cache import ResponseCache
+
+    now = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+
+    cache = ResponseCache(ttl=10)
+    cache.set('a', 1)
+    now[0] += 5
+    assert cache.get('a') == 1
+    now[0] += 10
+    assert cache.get('a') is None
+
+
+def test_cache_options():
+    from pyramid_restful.cache import ResponseCache
+
+    assert ResponseCache.create(None) is None
+    assert ResponseCache.create(30).ttl == 30
+    assert ResponseCache.create({'ttl': 5, 'max_entries': 10}).max_entries == 10
+
+    cache = ResponseCache()
+    assert ResponseCache.create(cache) is cache
+
+
+def test_cached_endpoint(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    calls = []
+
+    @endpoint.get(cache={'ttl': 60, 'max_entries': 10})
+    def cached_lookup(request):
+        calls.append(1)
+        return {'calls': len(calls)}
+
+    @cached_lookup.endpoint.post()
+    def update_lookup(request):
+        calls.append(1)
+        return {'calls': len(calls)}
+
+    pyramid_config.registry.rest_api.register(cached_lookup)
+
+    assert pyramid_app.get('/api/v1/cached_lookup').json == {'calls': 1}
+    assert pyramid_app.get('/api/v1/cached_lookup').json == {'calls': 1}
+    assert pyramid_app.get('/api/v1/cached_lookup?page=2').json == {'calls': 2}
+
+    # only the get method is cached
+    assert pyramid_app.post('/api/v1/cached_lookup').json == {'calls': 3}
+    assert pyramid_app.post('/api/v1/cached_lookup').json == {'calls': 4}
+
+    cached_lookup.endpoint.caches['get'].clear()
+    assert pyramid_app.get('/api/v1/cached_lookup').json == {'calls': 5}
+
+
+def test_cached_class_endpoint(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    calls = []
+
+    class cached_scope(object):
+        def __init__(self, request):
+            self.request = request
+
+        @endpoint.get(cache=60)
+        def lookup(self):
+            calls.append(1)
+            return len(calls)
+
+    pyramid_config.registry.rest_api.register(cached_scope)
+
+    assert pyramid_app.get('/api/v1/cached_scope/lookup').json == 1
+    assert pyramid_app.get('/api/v1/cached_scope/lookup').json == 1
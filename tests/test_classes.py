@@ -31,3 +31,100 @@ def test_unset_login_from_class(classes, pyramid_app):
 
     r = pyramid_app.get('/api/v1/auth/login')
     assert r.json is None
+
+def test_class_scopes(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    created = []
+
+    class shared(object):
+        def __init__(self):
+            created.append(self)
+
+        @endpoint.get()
+        def whoami(self, request):
+            return {'instance': created.index(self), 'name': request.params.get('name')}
+
+    class pooled(shared):
+        pass
+
+    api = pyramid_config.registry.rest_api
+    api.register(shared, scope='singleton')
+    api.register(pooled, scope='pooled', pool_size=2)
+
+    for i in range(3):
+        r = pyramid_app.get('/api/v1/shared/whoami?name=bob')
+        assert r.json == {'instance': 0, 'name': 'bob'}
+
+    for i in range(3):
+        r = pyramid_app.get('/api/v1/pooled/whoami')
+        assert r.json == {'instance': 1, 'name': None}
+
+    assert len(created) == 2
+
+
+def test_class_invalid_scope(pyramid_config):
+    api = pyramid_config.registry.rest_api
+    with pytest.raises(RuntimeError):
+        api.register([object], scope='missing')
+
+
+def test_pooled_scope_reuses_instances():
+    from pyramid.testing import DummyRequest
+    from pyramid_restful.services import PooledScope
+
+    class resource(object):
+        pass
+
+    scope = PooledScope(resource, size=2)
+    a = scope.acquire(DummyRequest())
+    b = scope.acquire(DummyRequest())
+    assert a is not b
+
+    scope.release(a)
+    assert scope.acquire(DummyRequest()) is a
+
+
+def test_pooled_scope_timeout():
+    from pyramid.httpexceptions import HTTPServiceUnavailable
+    from pyramid.testing import DummyRequest
+    from pyramid_restful.services import PooledScope
+
+    class resource(object):
+        pass
+
+    scope = PooledScope(resource, size=1, timeout=0.01)
+    scope.acquire(DummyRequest())
+    with pytest.raises(HTTPServiceUnavailable) as err:
+        scope.acquire(DummyRequest())
+    assert err.value.headers['Retry-After'] == '1'
+
+
+def test_pooled_scope_streamed(pyramid_config, pyramid_app):
+    from pyramid.httpexceptions import HTTPServiceUnavailable
+    from pyramid.testing import DummyRequest
+    from pyramid_restful import endpoint
+
+    held = []
+
+    class streamed(object):
+        @endpoint.get()
+        def rows(self, request):
+            for i in range(3):
+                # the instance is still held while the rows are read
+                try:
+                    scope.release(scope.acquire(DummyRequest()))
+                except HTTPServiceUnavailable:
+                    held.append(i)
+                yield i
+
+    api = pyramid_config.registry.rest_api
+    api.register(streamed, scope='pooled', pool_size=1, pool_timeout=0.01)
+    scope = api.services['streamed'][1]
+
+    assert pyramid_app.get('/api/v1/streamed/rows').json == [0, 1, 2]
+    assert held == [0, 1, 2]
+
+    # and is returned to the pool once they have been
+    assert pyramid_app.get('/api/v1/streamed/rows').json == [0, 1, 2]
+    assert held == [0, 1, 2] * 2
@@ -0,0 +1,65 @@
+import pytest
+
+
+@pytest.fixture()
+def cors_app():
+    from pyramid.config import Configurator
+    from pyramid_restful import endpoint
+    from webtest import TestApp
+
+    config = Configurator(settings={
+        'restful.api.root': '/api/v1',
+        'restful.cors.access_control_allow_origin': 'http://example.com',
+        'restful.cors.access_control_allow_methods': 'GET,POST',
+        'restful.cors.access_control_expose_headers': 'X-Total',
+        'restful.cors.access_control_max_age': '86400',
+        'restful.batch.path': 'batch',
+    })
+    config.include('pyramid_restful')
+
+    calls = []
+
+    @endpoint.get()
+    def users(request):
+        calls.append(1)
+        return []
+
+    @endpoint.get(pattern='/users/{id}')
+    def user(request):
+        calls.append(1)
+        return {'id': request.matchdict['id']}
+
+    config.registry.rest_api.register([users, user])
+    app = TestApp(config.make_wsgi_app())
+    app.calls = calls
+    return app
+
+
+def test_cors_preflight(cors_app):
+    for path in ('/api/v1/users', '/api/v1/users/1', '/api/v1/missing/path'):
+        r = cors_app.options(path)
+        assert r.status_code == 200
+        assert r.headers['Access-Control-Allow-Origin'] == 'http://example.com'
+        assert r.headers['Access-Control-Allow-Methods'] == 'GET,POST'
+        assert r.headers['Access-Control-Max-Age'] == '86400'
+
+    assert not cors_app.calls
+
+
+def test_cors_response_headers(cors_app):
+    r = cors_app.get('/api/v1/users/1')
+    assert r.json == {'id': '1'}
+    assert r.headers['Access-Control-Allow-Origin'] == 'http://example.com'
+    assert r.headers['Access-Control-Expose-Headers'] == 'X-Total'
+    assert 'Access-Control-Max-Age' not in r.headers
+
+
+def test_cors_batch(cors_app):
+    r = cors_app.options('/api/v1/batch')
+    assert r.status_code == 200
+    assert r.headers['Access-Control-Allow-Methods'] == 'GET,POST'
+
+    r = cors_app.post_json('/api/v1/batch', [{'path': '/users/1'}])
+    assert r.json == [{'status': 200, 'body': {'id': '1'}}]
+    assert r.headers['Access-Control-Allow-Origin'] == 'http://example.com'
+    assert r.headers['Access-Control-Expose-Headers'] == 'X-Total'
@@ -55,4 +55,40 @@ def test_creating_path_to_somewhere(basics, pyramid_app):
 def test_path_to_someid(basics, pyramid_app):
     r = pyramid_app.get('/api/v1/path/to/somewhere/special')
     assert r.status_code == 200
-    assert r.json == 'somewhere special'
\ No newline at end of file
+    assert r.json == 'somewhere special'
+
+def test_routes_listing_etag():
+    from pyramid.request import Request
+    from pyramid_restful import endpoint
+    from pyramid_restful.api import ApiFactory
+
+    @endpoint.get(pattern='/path/to/listing/{id}')
+    def listing(request):
+        return {}
+
+    @endpoint.post()
+    def other(request):
+        return {}
+
+    api = ApiFactory()
+    api.register([listing, other])
+
+    r = api.get_custom_return(Request.blank('/'), 'routes')
+    assert r.status_code == 200
+    assert r.json == {'/path/to/listing/{id}': 'get', '/other': 'post'}
+
+    etag = r.etag
+    r = api.get_custom_return(Request.blank('/', headers={'If-None-Match': '"{0}"'.format(etag)}), 'routes')
+    assert r.status_code == 304
+    assert r.etag == etag
+
+    # registering new services invalidates the listing
+    @endpoint.get()
+    def another(request):
+        return {}
+
+    api.register(another)
+    r = api.get_custom_return(Request.blank('/', headers={'If-None-Match': '"{0}"'.format(etag)}), 'routes')
+    assert r.status_code == 200
+    assert r.etag != etag
+    assert r.json['/another'] == 'get'
@@ -0,0 +1,118 @@
+import logging
+
+import pytest
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super(RecordingHandler, self).__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture()
+def recorder():
+    logger = logging.getLogger('tests.errors')
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.handlers = [RecordingHandler()]
+    return logger
+
+
+def test_error_names_cached():
+    from pyramid.httpexceptions import HTTPNotFound
+    from pyramid_restful.errors import error_names
+
+    names = error_names(HTTPNotFound)
+    assert names == ('httpnot_found', 'Httpnot Found')
+    assert error_names(HTTPNotFound) is names
+
+
+def test_error_log_levels(recorder):
+    from pyramid_restful.errors import ErrorLog
+
+    error_log = ErrorLog.from_settings(recorder, {
+        'restful.errors.level.404': 'debug',
+        'restful.errors.level.4xx': 'warning'
+    })
+    assert error_log.level(404) == logging.DEBUG
+    assert error_log.level(403) == logging.WARNING
+    assert error_log.level(500) == logging.ERROR
+
+    with pytest.raises(RuntimeError):
+        ErrorLog.from_settings(recorder, {'restful.errors.level.404': 'loud'})
+
+    try:
+        raise StandardError('failed')
+    except StandardError as err:
+        error_log.log(err, 403)
+        error_log.log(err, 500)
+
+        # client error tracebacks are only logged when sampled
+        error_log.traceback_sample_rate = 1.0
+        error_log.log(err, 404)
+
+    records = recorder.handlers[0].records
+    assert [record.levelno for record in records] == [logging.WARNING, logging.ERROR, logging.DEBUG]
+    assert [bool(record.exc_info) for record in records] == [False, True, True]
+    assert records[0].getMessage() == '403 StandardError: failed'
+
+
+def test_queue_handler(recorder):
+    from pyramid_restful.errors import QueueHandler
+
+    target = recorder.handlers[0]
+    handler = QueueHandler.install(recorder)
+    assert QueueHandler.install(recorder) is handler
+    assert recorder.handlers == [handler]
+
+    recorder.info('%s requests', 10)
+    handler.queue.join()
+    assert [record.getMessage() for record in target.records] == ['10 requests']
+
+
+def test_queue_handler_errors(recorder, monkeypatch):
+    from pyramid_restful.errors import ErrorLog, QueueHandler
+
+    target = recorder.handlers[0]
+    handler = QueueHandler.install(recorder)
+
+    # non-ascii error messages are logged as unicode
+    ErrorLog(recorder).log(ValueError(u'caf\xe9'), 500)
+    handler.queue.join()
+    assert target.records[-1].getMessage() == u'500 ValueError: caf\xe9'
+
+    # records that cannot be formatted are handed to handleError
+    failed = []
+    monkeypatch.setattr(handler, 'handleError', failed.append)
+    recorder.info('%s %s', 'missing')
+    assert len(failed) == 1
+
+
+def test_queue_handler_ancestors():
+    from pyramid_restful.errors import QueueHandler
+
+    parent = logging.getLogger('tests.queued')
+    parent.propagate = False
+    parent.handlers = [RecordingHandler()]
+
+    logger = logging.getLogger('tests.queued.api')
+    logger.setLevel(logging.DEBUG)
+    logger.handlers = [RecordingHandler()]
+    targets = logger.handlers + parent.handlers
+
+    # the parent does not propagate, so the root handlers are not included
+    handler = QueueHandler.install(logger)
+    assert handler.handlers == targets
+
+    logger.info('queued')
+    handler.queue.join()
+    assert [[record.getMessage() for record in target.records] for target in targets] == [['queued'], ['queued']]
+
+
+def test_client_error_response(pyramid_app):
+    r = pyramid_app.get('/api/v1/missing_endpoint', expect_errors=True)
+    assert r.status_code == 404
+    assert r.json['type'] == 'httpnot_found'
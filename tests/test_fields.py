@@ -0,0 +1,58 @@
+import pytest
+
+
+def test_fieldset_prune():
+    from pyramid_restful.fields import FieldSet
+
+    class Record(object):
+        def __json__(self):
+            return {'id': 1, 'name': 'a', 'secret': 'b'}
+
+    fields = FieldSet(['id', 'address.city', 'tags.name', 'record.name', 'missing'])
+    assert 'address' in fields
+    value = {
+        'id': 1,
+        'name': 'a',
+        'address': {'city': 'Springfield', 'zip': '12345'},
+        'tags': [{'id': 1, 'name': 'x'}, {'id': 2, 'name': 'y'}],
+        'record': Record()
+    }
+    assert fields.prune(value) == {
+        'id': 1,
+        'address': {'city': 'Springfield'},
+        'tags': [{'name': 'x'}, {'name': 'y'}],
+        'record': {'name': 'a'}
+    }
+    assert list(fields.prune(iter([{'id': 1, 'name': 'a'}]))) == [{'id': 1}]
+    assert FieldSet(['address']).prune(value)['address'] == value['address']
+
+
+def test_fields_param(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    @endpoint.get()
+    def fields_records(request):
+        assert request.fields is None or 'id' in request.fields
+        return [{'id': i, 'name': 'record', 'owner': {'id': 1, 'name': 'me'}} for i in xrange(2)]
+
+    @endpoint.get()
+    def fields_stream(request):
+        return iter([{'id': 1, 'name': 'record'}])
+
+    @endpoint.get()
+    def fields_error(request):
+        raise StandardError('failed')
+
+    pyramid_config.registry.rest_api.register([fields_records, fields_stream, fields_error])
+
+    r = pyramid_app.get('/api/v1/fields_records?fields=id,owner.name')
+    assert r.json == [{'id': 0, 'owner': {'name': 'me'}}, {'id': 1, 'owner': {'name': 'me'}}]
+
+    r = pyramid_app.get('/api/v1/fields_records?fields=id&fields=name')
+    assert r.json == [{'id': 0, 'name': 'record'}, {'id': 1, 'name': 'record'}]
+
+    assert len(pyramid_app.get('/api/v1/fields_records').json[0]) == 3
+    assert pyramid_app.get('/api/v1/fields_stream?fields=name').json == [{'name': 'record'}]
+
+    r = pyramid_app.get('/api/v1/fields_error?fields=id', expect_errors=True)
+    assert r.json['type'] == 'server_error'
@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+# modules only needed to render documentation or serialize with projex, which
+# should not be loaded while an application starts up
+DEFERRED_MODULES = ('markdown', 'jinja2', 'projex.rest', 'projex.text', 'multiprocessing.pool')
+
+SCRIPT = """
+import json
+import sys
+import time
+
+from pyramid.config import Configurator
+
+start = time.time()
+import pyramid_restful
+config = Configurator(settings={'restful.api.root': '/api/v1'})
+config.include('pyramid_restful')
+config.commit()
+seconds = time.time() - start
+
+print(json.dumps({
+    'seconds': seconds,
+    'loaded': sorted(name for name in %r if name in sys.modules)
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def test_import_and_include_time(record_property):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT], cwd=root)
+    result = json.loads(output.strip().splitlines()[-1])
+
+    record_property('import_include_seconds', result['seconds'])
+    assert result['loaded'] == []
+    assert result['seconds'] < float(os.environ.get('RESTFUL_IMPORT_BUDGET', 2.0))
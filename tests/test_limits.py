@@ -0,0 +1,91 @@
+import pytest
+
+
+def test_concurrency_limit():
+    import threading
+    from pyramid_restful.limits import ConcurrencyLimit
+
+    assert ConcurrencyLimit.create() is None
+
+    limit = ConcurrencyLimit.create(max_concurrency=1, queue_timeout=0.05)
+    assert limit.retry_after == 1
+    assert limit.acquire()
+    assert not limit.acquire()
+    assert limit.snapshot() == {'active': 1, 'queued': 0, 'rejected': 1}
+
+    # a queued request gets the slot once it is released
+    timer = threading.Timer(0.01, limit.release)
+    timer.start()
+    limit.queue_timeout = 5
+    assert limit.acquire()
+    timer.join()
+    assert limit.snapshot() == {'active': 1, 'queued': 0, 'rejected': 1}
+
+
+def test_limited_iterator():
+    from pyramid_restful.limits import ConcurrencyLimit
+
+    limit = ConcurrencyLimit(max_concurrency=3)
+
+    # released once exhausted, closed or discarded
+    for _ in xrange(3):
+        limit.acquire()
+    exhausted = limit.wrap(iter([1, 2]))
+    closed = limit.wrap(x for x in [1, 2])
+    discarded = limit.wrap(iter([1, 2]))
+
+    assert list(exhausted) == [1, 2]
+    assert next(closed) == 1
+    closed.close()
+    closed.close()
+    assert next(discarded) == 1
+    del discarded
+    assert limit.active == 0
+
+
+def test_saturated_endpoint():
+    from pyramid.config import Configurator
+    from pyramid_restful import endpoint
+    from webtest import TestApp
+
+    config = Configurator(settings={
+        'restful.api.root': '/api/v1',
+        'restful.metrics': 'true',
+    })
+    config.include('pyramid_restful')
+
+    @endpoint.get(max_concurrency=1, queue_timeout=0.01)
+    def expensive(request):
+        return 'done'
+
+    config.registry.rest_api.register(expensive)
+    app = TestApp(config.make_wsgi_app())
+
+    assert app.get('/api/v1/expensive').json == 'done'
+
+    limit = expensive.endpoint.limits['get']
+    limit.acquire()
+    r = app.get('/api/v1/expensive', status=503)
+    assert r.headers['Retry-After'] == '1'
+    limit.release()
+
+    assert app.get('/api/v1/expensive').json == 'done'
+
+    # streamed results hold their slot until they have been read
+    rows = []
+
+    @endpoint.get(max_concurrency=1)
+    def streamed(request):
+        for i in xrange(3):
+            rows.append(streamed.endpoint.limits['get'].active)
+            yield i
+
+    config.registry.rest_api.register(streamed)
+    assert app.get('/api/v1/streamed').json == [0, 1, 2]
+    assert rows == [1, 1, 1]
+    assert streamed.endpoint.limits['get'].active == 0
+
+    metrics = app.get('/api/v1?returning=metrics').json['/expensive']['get']
+    assert metrics['rejected'] == 1
+    assert metrics['queued'] == 0
+    assert metrics['error_types'] == {'HTTPServiceUnavailable': 1}
@@ -0,0 +1,86 @@
+import json
+import sys
+
+import pytest
+
+
+def make_app(**settings):
+    from pyramid.config import Configurator
+    from webtest import TestApp
+
+    settings['restful.api.root'] = '/api/v1'
+    config = Configurator(settings=settings)
+    config.include('pyramid_restful')
+    return config.registry.rest_api, TestApp(config.make_wsgi_app())
+
+
+def test_manifest_lazy_loading(tmpdir):
+    from pyramid_restful.manifest import write_manifest
+    from tests import catalog
+
+    api, _ = make_app()
+    assert not api.manifest_loaded
+    api.register([catalog, catalog.products, catalog.catalog_version])
+    api.register(catalog.stock, scope='pooled', pool_size=2)
+
+    path = str(tmpdir.join('manifest.json'))
+    write_manifest(api, path)
+
+    with open(path) as f:
+        manifest = json.load(f)
+
+    services = {entry['name']: entry for entry in manifest['services']}
+    assert services['catalog']['import'] == 'tests.catalog'
+    assert services['catalog']['endpoints']['secure'] == {'get': 'system.Authenticated'}
+    assert services['products']['import'] == 'tests.catalog:products'
+    assert services['stock']['scope'] == 'pooled'
+    assert services['catalog_version']['routes'] == {'/catalog_version': 'get'}
+    assert manifest['routes'] == [
+        {'pattern': '/catalog/items/{id}', 'import': 'tests.catalog:item', 'methods': {'get': None}}
+    ]
+
+    # the services are only imported once they are requested
+    del sys.modules['tests.catalog']
+    api, app = make_app(**{'restful.manifest': path})
+    assert api.manifest_loaded
+    assert 'tests.catalog' not in sys.modules
+
+    routes = app.get('/api/v1?returning=routes', headers={'Accept': 'application/json'}).json
+    assert routes['/catalog/items/{id}'] == 'get'
+    assert routes['/products/featured'] == 'get'
+    assert 'tests.catalog' not in sys.modules
+
+    assert app.get('/api/v1/catalog/items/3').json == {'id': '3'}
+    assert 'tests.catalog' in sys.modules
+
+    assert app.get('/api/v1/products/featured').json == ['a']
+    assert app.get('/api/v1/stock/count').json == 10
+    assert app.get('/api/v1/catalog_version').json == 1
+    assert app.get('/api/v1/catalog/secure').json == {}
+
+
+def test_manifest_ignored_while_building(tmpdir, monkeypatch):
+    from pyramid_restful import manifest
+
+    path = str(tmpdir.join('manifest.json'))
+    tmpdir.join('manifest.json').write(json.dumps({'version': manifest.MANIFEST_VERSION, 'services': [], 'routes': []}))
+
+    monkeypatch.setattr(manifest, '_BUILDING', True)
+    api, _ = make_app(**{'restful.manifest': path})
+    assert not api.manifest_loaded
+
+
+def test_manifest_requires_importable_services():
+    from pyramid_restful import endpoint
+
+    @endpoint.get()
+    def local_endpoint(request):
+        return {}
+
+    api, _ = make_app()
+    api.register(local_endpoint)
+    with pytest.raises(RuntimeError):
+        api.manifest()
+
+    with pytest.raises(RuntimeError):
+        api.load_manifest({'version': 0})
@@ -0,0 +1,122 @@
+import pytest
+
+
+@pytest.fixture()
+def metrics_app():
+    from pyramid.config import Configurator
+    from pyramid_restful import endpoint
+    from webtest import TestApp
+
+    config = Configurator(settings={
+        'restful.api.root': '/api/v1',
+        'restful.metrics': 'true',
+        'restful.metrics.path': 'metrics',
+    })
+    config.include('pyramid_restful')
+
+    @endpoint.get()
+    def measured(request):
+        return 'ok'
+
+    @endpoint.get(pattern='/measured/{id}')
+    def measured_item(request):
+        raise StandardError('failed')
+
+    class measured_scope(object):
+        def __init__(self, request):
+            self.request = request
+
+        @endpoint.get()
+        def lookup(self):
+            return 1
+
+    config.registry.rest_api.register([measured, measured_item, measured_scope])
+    app = TestApp(config.make_wsgi_app())
+    app.api = config.registry.rest_api
+    return app
+
+
+def test_histogram_buckets():
+    from pyramid_restful.metrics import Histogram, BUCKETS
+
+    hist = Histogram()
+    hist.observe(0.0001)
+    hist.observe(0.003)
+    hist.observe(100)
+
+    snapshot = hist.snapshot()
+    assert snapshot['count'] == 3
+    assert snapshot['buckets'][0] == (BUCKETS[0], 1)
+    assert snapshot['buckets'][-1] == ('+Inf', 3)
+    assert snapshot['buckets'][-2] == (BUCKETS[-1], 2)
+
+
+def test_endpoint_metrics(metrics_app):
+    metrics_app.get('/api/v1/measured')
+    metrics_app.get('/api/v1/measured')
+    metrics_app.get('/api/v1/measured/1', expect_errors=True)
+    metrics_app.get('/api/v1/measured_scope/lookup')
+    metrics_app.get('/api/v1/missing', expect_errors=True)
+
+    snapshot = metrics_app.get('/api/v1?returning=metrics').json
+    assert sorted(snapshot.keys()) == ['/measured', '/measured/{id}', '/measured_scope/lookup']
+
+    measured = snapshot['/measured']['get']
+    assert measured['calls'] == 2
+    assert measured['errors'] == 0
+    assert sorted(measured['latency'].keys()) == ['call', 'permission', 'render', 'total', 'traversal']
+    assert measured['latency']['total']['count'] == 2
+
+    assert snapshot['/measured/{id}']['get']['errors'] == 1
+    assert snapshot['/measured/{id}']['get']['error_types'] == {'StandardError': 1}
+    assert snapshot['/measured/{id}']['get']['in_flight'] == 0
+    assert snapshot['/measured_scope/lookup']['get']['calls'] == 1
+
+    metrics_app.api.metrics.reset()
+    assert metrics_app.get('/api/v1?returning=metrics').json == {}
+
+
+def test_metrics_disabled(pyramid_app):
+    pyramid_app.get('/api/v1?returning=metrics', status=400)
+
+
+def test_prometheus_exposition(metrics_app):
+    metrics_app.get('/api/v1/measured')
+    metrics_app.get('/api/v1/measured/1', expect_errors=True)
+
+    r = metrics_app.get('/api/v1/metrics')
+    assert r.content_type == 'text/plain'
+    lines = r.text.splitlines()
+
+    assert 'restful_requests_total{endpoint="/measured",method="get"} 1' in lines
+    assert 'restful_requests_in_flight{endpoint="/measured",method="get"} 0' in lines
+    assert 'restful_request_errors_total{endpoint="/measured/{id}",method="get",type="StandardError"} 1' in lines
+    assert 'restful_request_duration_seconds_bucket{endpoint="/measured",le="+Inf",method="get",phase="total"} 1' in lines
+    assert 'restful_request_duration_seconds_count{endpoint="/measured",method="get",phase="call"} 1' in lines
+    assert '# TYPE restful_request_duration_seconds histogram' in lines
+
+
+def test_file_backend_merges_workers(tmpdir):
+    import json
+    import os
+    from pyramid_restful.metrics import FileBackend, Metrics, RequestTimings
+
+    backend = FileBackend(str(tmpdir))
+    metrics = Metrics(backend=backend)
+
+    timings = RequestTimings()
+    timings.finish()
+    metrics.get('/measured', 'GET').record(timings)
+    metrics.get('/measured', 'GET').enter()
+
+    # a stopped worker keeps its counters but has nothing in flight
+    stopped = {'/measured': {'get': metrics.get('/measured', 'GET').snapshot()}}
+    with open(backend.path(pid=2 ** 22 + 1), 'w') as f:
+        json.dump(stopped, f)
+
+    merged = metrics.collect()['/measured']['get']
+    assert os.path.exists(backend.path())
+    assert merged['calls'] == 2
+    assert merged['in_flight'] == 1
+    assert merged['latency']['total']['count'] == 2
+    assert merged['latency']['total']['buckets'][-1][1] == 2
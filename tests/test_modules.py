@@ -31,3 +31,33 @@ def test_unset_login_from_class(modules, pyramid_app):
 
     r = pyramid_app.get('/api/v1/oauth/login')
     assert r.json is None
+
+def test_module_documentation_rendered_once(modules, pyramid_app):
+    from pyramid_restful.documentation import Section
+
+    assert 'oauth' not in modules.sections
+    pyramid_app.get('/api/v1', headers={'Accept': 'text/html'})
+
+    (group_name, section), = modules.sections['oauth']
+    assert group_name == 'Topics'
+    assert isinstance(section, Section)
+    assert section.id == 'oauth'
+    assert not hasattr(section, '__dict__')
+
+def test_module_routes(modules, classes, pyramid_app):
+    r = pyramid_app.get('/api/v1?returning=routes', headers={'Accept': 'application/json'})
+    assert r.json['/oauth/login'] == 'delete,get,post'
+    assert r.json['/auth/login'] == 'delete,get,post'
+    assert '/oauth/unexposed' not in r.json
+    assert '/auth/unexposed' not in r.json
+
+def test_module_index_frozen(modules, classes):
+    assert 'login' in modules.indexes['oauth']
+
+    for index in (modules.indexes['oauth'], modules.indexes['auth']):
+        with pytest.raises(TypeError):
+            index['other'] = None
+        with pytest.raises(TypeError):
+            index.update({})
+        with pytest.raises(TypeError):
+            index.pop('login')
@@ -0,0 +1,113 @@
+import pytest
+
+
+@pytest.fixture()
+def paginated_app():
+    from pyramid.config import Configurator
+    from pyramid_restful import endpoint
+    from webtest import TestApp
+
+    config = Configurator(settings={
+        'restful.api.root': '/api/v1',
+        'restful.pagination.secret': 'secret',
+    })
+    config.include('pyramid_restful')
+
+    records = [{'id': i, 'name': 'record {0}'.format(i)} for i in xrange(1, 26)]
+    fetched = []
+
+    @endpoint.get(paginate={'default_size': 10, 'max_size': 20})
+    def records_list(request):
+        page = request.page
+        fetched.append(page.fetch_size)
+        return [r for r in records if page.after is None or r['id'] > page.after][:page.fetch_size]
+
+    @endpoint.get(paginate=lambda record: [record['name'], record['id']])
+    def records_stream(request):
+        return iter(records[:request.page.fetch_size])
+
+    config.registry.rest_api.register([records_list, records_stream])
+    app = TestApp(config.make_wsgi_app())
+    app.fetched = fetched
+    return app
+
+
+@pytest.mark.parametrize('secret, warned', [(None, True), ('secret', False)])
+def test_pagination_secret_warning(secret, warned):
+    import logging
+    from pyramid.config import Configurator
+
+    records = []
+
+    class RecordingHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    settings = {'restful.api.root': '/api/v1'}
+    if secret:
+        settings['restful.pagination.secret'] = secret
+
+    logger = logging.getLogger('pyramid_restful.api')
+    handler = RecordingHandler(logging.WARNING)
+    logger.addHandler(handler)
+    try:
+        config = Configurator(settings=settings)
+        config.include('pyramid_restful')
+    finally:
+        logger.removeHandler(handler)
+
+    messages = [record.getMessage() for record in records]
+    assert any('restful.pagination.secret' in message for message in messages) == warned
+
+
+def test_cursor_signing():
+    from pyramid.httpexceptions import HTTPBadRequest
+    from pyramid_restful.pagination import Paginator
+
+    paginator = Paginator()
+    cursor = paginator.encode([u'b', 10], 'secret')
+    assert paginator.decode(cursor, 'secret') == [u'b', 10]
+
+    for invalid in (cursor + 'x', cursor.replace('.', 'x.'), 'garbage', u'\xe9', '\xc3\xa9'):
+        with pytest.raises(HTTPBadRequest):
+            paginator.decode(invalid, 'secret')
+
+    with pytest.raises(HTTPBadRequest):
+        paginator.decode(cursor, 'other')
+
+
+def test_cursor_keys():
+    import datetime
+    import decimal
+    from pyramid_restful.pagination import Paginator
+
+    paginator = Paginator()
+    key = [datetime.datetime(2016, 5, 1, 12, 30), datetime.date(2016, 5, 1), decimal.Decimal('1.50'), 10]
+    cursor = paginator.encode(key, 'secret')
+    assert paginator.decode(cursor, 'secret') == [u'2016-05-01T12:30:00', u'2016-05-01', u'1.50', 10]
+
+    with pytest.raises(TypeError):
+        paginator.encode(object(), 'secret')
+
+
+def test_paginated_endpoint(paginated_app):
+    r = paginated_app.get('/api/v1/records_list?search=a')
+    assert [record['id'] for record in r.json] == range(1, 11)
+
+    cursor = r.headers['X-Next-Cursor']
+    assert r.headers['Link'] == '<http://localhost/api/v1/records_list?search=a&cursor={0}>; rel="next"'.format(cursor)
+
+    r = paginated_app.get('/api/v1/records_list', {'cursor': cursor, 'limit': 100})
+    assert [record['id'] for record in r.json] == range(11, 26)
+    assert 'Link' not in r.headers
+    assert paginated_app.fetched == [11, 21]
+
+    paginated_app.get('/api/v1/records_list', {'cursor': 'invalid'}, status=400)
+    paginated_app.get('/api/v1/records_list?cursor=%C3%A9', status=400)
+    paginated_app.get('/api/v1/records_list', {'limit': 'all'}, status=400)
+
+
+def test_paginated_stream(paginated_app):
+    r = paginated_app.get('/api/v1/records_stream?limit=2')
+    assert [record['id'] for record in r.json] == [1, 2]
+    assert 'cursor=' in r.headers['Link']
@@ -0,0 +1,91 @@
+import json
+import time
+
+import pytest
+
+
+def make_reader(body, **options):
+    from pyramid.request import Request
+    from pyramid_restful.reader import JSONBodyReader
+
+    request = Request.blank('/', method='POST', body=body)
+    request.content_type = 'application/json'
+    options.setdefault('chunk_size', 4)
+    return JSONBodyReader(request, **options)
+
+
+def test_reader_items():
+    data = [{'name': 'a "quoted", [value]\\'}, [1, [2, 3]], 'x,y', 4, None]
+    assert list(make_reader(json.dumps(data)).items()) == data
+    assert list(make_reader(' [ ] ').items()) == []
+
+    # values split across chunks
+    assert list(make_reader('[123456789, -1.5e10, true]', chunk_size=3).items()) == [123456789, -1.5e10, True]
+
+
+def test_reader_items_streamed():
+    reader = make_reader('[1, 2, {"a": ')
+    items = reader.items()
+    assert next(items) == 1
+    assert next(items) == 2
+
+    from pyramid.httpexceptions import HTTPBadRequest
+    with pytest.raises(HTTPBadRequest):
+        next(items)
+
+
+def test_reader_load():
+    data = {'records': [{'id': i, 'name': u'r\xe9cord {0}'.format(i)} for i in xrange(20)]}
+    assert make_reader(json.dumps(data)).load() == data
+
+
+def test_reader_limits():
+    from pyramid.httpexceptions import HTTPBadRequest, HTTPRequestEntityTooLarge
+
+    with pytest.raises(HTTPRequestEntityTooLarge):
+        make_reader('[' + '1,' * 100 + '1]', max_size=50).load()
+
+    reader = make_reader('[' + '1,' * 100 + '1]', max_size=50)
+    reader.request.content_length = None
+    reader.request.environ['wsgi.input_terminated'] = True
+    items = reader.items()
+    assert next(items) == 1
+    with pytest.raises(HTTPRequestEntityTooLarge):
+        list(items)
+
+    with pytest.raises(HTTPBadRequest):
+        make_reader('[[[[1]]]]', max_depth=3).load()
+    assert make_reader('[[["]]]]"], {}], [[1]]]', max_depth=3).load() == [[[']]]]'], {}], [[1]]]
+    assert make_reader('["\\"[[[["]', max_depth=1).load() == ['"[[[[']
+
+    assert make_reader('["\\\\", [["\\\\\\"]"]]]', max_depth=3).load() == ['\\', [['\\"]']]]
+
+    # escaped quotes in an unterminated string are checked in linear time
+    start = time.time()
+    with pytest.raises(HTTPBadRequest):
+        make_reader('[' * 65 + '"' + 'a\\"' * 200000, chunk_size=65536).load()
+    assert time.time() - start < 1
+
+    for body in ('[[[[1]]]]', '[' * 5000 + ']' * 5000):
+        with pytest.raises(HTTPBadRequest):
+            list(make_reader(body, max_depth=3).items())
+
+    for body in ('{"a": 1}', '[1] [2]', '[1, 2', '[1 2]', '[1,]', '[1, ]', '[,1]', '[tru]'):
+        with pytest.raises(HTTPBadRequest):
+            list(make_reader(body).items())
+
+
+def test_reader_request_method(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    @endpoint.post()
+    def import_items(request):
+        return sum(item['value'] for item in request.json_reader.items())
+
+    pyramid_config.registry.rest_api.register(import_items)
+
+    r = pyramid_app.post_json('/api/v1/import_items', [{'value': 1}, {'value': 2}])
+    assert r.json == 3
+
+    r = pyramid_app.post_json('/api/v1/import_items', {'value': 1}, expect_errors=True)
+    assert r.status_code == 400
@@ -0,0 +1,252 @@
+import datetime
+import decimal
+import json
+import pytest
+
+
+def render(renderer, value):
+    return renderer(None)(value, {'request': None})
+
+
+def test_default_backend_is_jsonify():
+    import projex.rest
+    from pyramid_restful.renderer import JSON2, jsonify
+
+    renderer = JSON2()
+    assert renderer.serializer is jsonify
+    assert render(renderer, {'a': 1}) == projex.rest.jsonify({'a': 1})
+
+
+def test_custom_serializer_is_used():
+    from pyramid_restful.renderer import JSON2
+
+    renderer = JSON2(serializer=lambda value, default=None: 'custom')
+    assert render(renderer, {'a': 1}) == 'custom'
+
+
+def test_json_backend_adapters():
+    from pyramid_restful.renderer import JSON2
+
+    class Record(object):
+        def __json__(self, *args):
+            return {'id': 1}
+
+    renderer = JSON2(backend='json')
+    value = {
+        'created': datetime.datetime(2016, 1, 2, 3, 4, 5),
+        'day': datetime.date(2016, 1, 2),
+        'amount': decimal.Decimal('1.50'),
+        'tags': {'a'},
+        'record': Record()
+    }
+
+    output = render(renderer, value)
+    assert ' ' not in output
+    assert json.loads(output) == {
+        'created': '2016-01-02T03:04:05',
+        'day': '2016-01-02',
+        'amount': '1.50',
+        'tags': ['a'],
+        'record': {'id': 1}
+    }
+
+
+@pytest.mark.parametrize('backend', ['json', 'simplejson', 'rapidjson'])
+def test_backend_decimal_adapter(backend):
+    from pyramid_restful.renderer import JSON2
+
+    pytest.importorskip(backend)
+
+    renderer = JSON2(backend=backend)
+    output = render(renderer, {'amount': decimal.Decimal('1.50')})
+    assert json.loads(output) == {'amount': '1.50'}
+
+
+def test_dotted_backend_falls_back_to_jsonify():
+    import projex.rest
+    from pyramid_restful.renderer import JSON2
+
+    renderer = JSON2(backend='tests.test_renderer:failing_dumps')
+    assert render(renderer, {'a': 1}) == projex.rest.jsonify({'a': 1})
+
+
+def test_invalid_backend():
+    from pyramid_restful.renderer import JSON2
+
+    with pytest.raises(ValueError):
+        JSON2(backend='missing')
+
+
+def failing_dumps(value, **kw):
+    raise TypeError('cannot encode')
+
+
+def test_stream_generator_in_chunks():
+    from pyramid_restful.renderer import JSON2
+
+    renderer = JSON2(backend='json', chunk_size=2)
+    chunks = list(render(renderer, ({'id': i} for i in xrange(5))))
+
+    assert len(chunks) == 3
+    assert json.loads(''.join(chunks)) == [{'id': i} for i in xrange(5)]
+    assert list(render(renderer, iter([]))) == ['[]']
+
+
+def test_stream_errors_before_content():
+    from pyramid_restful.renderer import JSON2
+
+    def rows():
+        raise RuntimeError('no connection')
+        yield {}
+
+    with pytest.raises(RuntimeError):
+        render(JSON2(), rows())
+
+
+def test_stream_endpoint(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    @endpoint.get()
+    def streamed_rows(request):
+        return ({'id': i} for i in xrange(250))
+
+    pyramid_config.registry.rest_api.register(streamed_rows)
+
+    r = pyramid_app.get('/api/v1/streamed_rows')
+    assert r.content_type == 'application/json'
+    assert r.json == [{'id': i} for i in xrange(250)]
+
+
+def test_etag_not_modified(pyramid_config):
+    from pyramid.request import Request
+    from pyramid_restful.renderer import JSON2
+
+    def make_request(**headers):
+        request = Request.blank('/', headers=headers)
+        request.registry = pyramid_config.registry
+        return request
+
+    renderer = JSON2(etag=True)
+
+    request = make_request()
+    body = renderer(None)({'a': 1}, {'request': request})
+    etag = request.response.etag
+    assert body and etag
+
+    request = make_request(**{'If-None-Match': '"{0}"'.format(etag)})
+    assert renderer(None)({'a': 1}, {'request': request}) == ''
+    assert request.response.status_int == 304
+
+    request = make_request(**{'If-None-Match': '"{0}"'.format(etag)})
+    assert renderer(None)({'a': 2}, {'request': request}) != ''
+    assert request.response.status_int == 200
+
+
+def test_etag_error_response(pyramid_config, pyramid_app):
+    from pyramid.httpexceptions import HTTPNotFound
+    from pyramid_restful import endpoint
+    from pyramid_restful.renderer import JSON2
+
+    pyramid_config.add_renderer('json2', JSON2(etag=True))
+    pyramid_config.commit()
+
+    @endpoint.get(etag=lambda request: 'version-1')
+    def missing_record(request):
+        raise HTTPNotFound('Record not found')
+
+    @endpoint.get()
+    def missing_file(request):
+        raise HTTPNotFound('File not found')
+
+    pyramid_config.registry.rest_api.register(missing_record)
+    pyramid_config.registry.rest_api.register(missing_file)
+
+    r = pyramid_app.get('/api/v1/missing_record', status=404)
+    assert r.etag is None
+    assert r.json['type'] == 'httpnot_found'
+
+    r = pyramid_app.get('/api/v1/missing_file', status=404)
+    assert r.etag is None
+
+    r = pyramid_app.get('/api/v1/missing_file', headers={'If-None-Match': '*'}, status=404)
+    assert r.json['type'] == 'httpnot_found'
+
+
+def test_etag_version_hook(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    calls = []
+
+    @endpoint.get(etag=lambda request: 'version-1')
+    def versioned(request):
+        calls.append(1)
+        return {'calls': len(calls)}
+
+    pyramid_config.registry.rest_api.register(versioned)
+
+    r = pyramid_app.get('/api/v1/versioned')
+    assert r.etag == 'version-1'
+    assert r.json == {'calls': 1}
+
+    r = pyramid_app.get('/api/v1/versioned', headers={'If-None-Match': '"version-1"'}, status=304)
+    assert r.body == ''
+    assert len(calls) == 1
+
+
+def test_compression(pyramid_config):
+    import gzip
+    import StringIO
+    import zlib
+    from pyramid.request import Request
+    from pyramid_restful.renderer import JSON2
+
+    def make_request(encoding):
+        request = Request.blank('/', headers={'Accept-Encoding': encoding})
+        request.registry = pyramid_config.registry
+        return request
+
+    renderer = JSON2(backend='json', compression=True, compression_min_size=100)
+    value = [{'id': i} for i in xrange(50)]
+
+    request = make_request('gzip, deflate')
+    body = renderer(None)(value, {'request': request})
+    assert request.response.content_encoding == 'gzip'
+    assert 'Accept-Encoding' in request.response.vary
+    assert json.loads(gzip.GzipFile(fileobj=StringIO.StringIO(body)).read()) == value
+
+    request = make_request('deflate')
+    body = renderer(None)(value, {'request': request})
+    assert request.response.content_encoding == 'deflate'
+    assert json.loads(zlib.decompress(body)) == value
+
+    # small payloads are not compressed
+    request = make_request('gzip')
+    assert renderer(None)({'id': 1}, {'request': request}) == '{"id":1}'
+    assert request.response.content_encoding is None
+
+    # clients that do not accept compression
+    request = make_request('identity')
+    assert json.loads(renderer(None)(value, {'request': request})) == value
+    assert request.response.content_encoding is None
+
+    # clients that do not send an Accept-Encoding header
+    request = Request.blank('/')
+    request.registry = pyramid_config.registry
+    assert json.loads(renderer(None)(value, {'request': request})) == value
+    assert request.response.content_encoding is None
+
+
+def test_compression_streamed(pyramid_config):
+    import zlib
+    from pyramid.request import Request
+    from pyramid_restful.renderer import JSON2
+
+    request = Request.blank('/', headers={'Accept-Encoding': 'gzip'})
+    request.registry = pyramid_config.registry
+
+    renderer = JSON2(backend='json', compression=True, chunk_size=10)
+    chunks = list(renderer(None)(({'id': i} for i in xrange(50)), {'request': request}))
+
+    assert request.response.content_encoding == 'gzip'
+    assert len(chunks) > 2
+    assert json.loads(zlib.decompress(''.join(chunks), 16 + zlib.MAX_WBITS)) == [{'id': i} for i in xrange(50)]
@@ -0,0 +1,60 @@
+import pytest
+
+PATTERNS = [
+    '/path/to/somewhere',
+    '/path/to/somewhere/{id}',
+    '/path/{kind}/somewhere',
+    '/path/to/{name}',
+    '/users/{id}/posts/{post_id}',
+    '/files/{name}.json',
+    '/numbers/{id:\d+}',
+    '/static/*subpath',
+]
+
+PATHS = [
+    ('path', 'to', 'somewhere'),
+    ('path', 'to', 'somewhere', 'special'),
+    ('path', 'from', 'somewhere'),
+    ('path', 'to', 'elsewhere'),
+    ('path', 'to'),
+    ('users', '1', 'posts', '2'),
+    ('files', 'data.json'),
+    ('files', 'data.xml'),
+    ('numbers', '10'),
+    ('numbers', 'ten'),
+    ('static', 'css', 'site.css'),
+    ('missing',),
+]
+
+
+def test_trie_matches_linear_scan():
+    from pyramid.urldispatch import Route
+    from pyramid_restful.routes import RouteTrie
+
+    trie = RouteTrie()
+    routes = []
+    for pattern in PATTERNS:
+        trie.add(pattern, pattern)
+        routes.append((Route('', pattern), pattern))
+
+    for traverse in PATHS:
+        traversed = '/' + '/'.join(traverse)
+        for route, pattern in routes:
+            result = route.match(traversed)
+            if result is not None:
+                expected = (pattern, result)
+                break
+        else:
+            expected = None
+
+        assert trie.match(traverse) == expected
+
+
+def test_trie_first_registered_wins():
+    from pyramid_restful.routes import RouteTrie
+
+    trie = RouteTrie()
+    trie.add('/path/{name}', 'placeholder')
+    trie.add('/path/static', 'static')
+
+    assert trie.match(('path', 'static')) == ('placeholder', {'name': 'static'})
@@ -65,4 +65,48 @@ def test_payload_parsing_for_overrides():
     data = get_payload(request)
 
     assert len(data) == 1
-    assert data['test_param'] == '11'
\ No newline at end of file
+    assert data['test_param'] == '11'
+
+def test_payload_is_lazy_and_read_only():
+    from pyramid.testing import DummyRequest
+    from webob.multidict import NestedMultiDict
+    from pyramid_restful.utils import Payload
+
+    class Request(DummyRequest):
+        parsed = 0
+
+        @property
+        def json_body(self):
+            self.parsed += 1
+            return {'test_data': '11', 'test_param': '12'}
+
+    request = Request(NestedMultiDict({'test_param': '10', 'page': '2'}))
+    payload = Payload(request)
+    assert request.parsed == 0
+
+    assert payload['test_param'] == '12'
+    assert payload['page'] == '2'
+    assert 'test_data' in payload
+    assert sorted(payload) == ['page', 'test_data', 'test_param']
+    assert len(payload) == 3
+    assert request.parsed == 1
+
+    with pytest.raises(TypeError):
+        payload['page'] = '3'
+
+
+def test_payload_request_property(pyramid_config, pyramid_app):
+    from pyramid_restful import endpoint
+
+    @endpoint.post()
+    def payload_echo(request):
+        assert request.payload is request.payload
+        return dict(request.payload)
+
+    pyramid_config.registry.rest_api.register(payload_echo)
+
+    r = pyramid_app.post_json('/api/v1/payload_echo?page=1&name=a', {'name': 'b'})
+    assert r.json == {'page': '1', 'name': 'b'}
+
+    r = pyramid_app.post_json('/api/v1/payload_echo', [1, 2], expect_errors=True)
+    assert r.status_code == 400